@@ -22,16 +22,67 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'tasks.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'tasks.context.UserContextMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware'
 
 ]
 
+# Response compression (tasks.middleware.CompressionMiddleware);
+# see `python manage.py benchmark_compression` before changing levels
+COMPRESSION_MIN_SIZE = 200
+COMPRESSION_BROTLI_QUALITY = 4
+COMPRESSION_GZIP_LEVEL = 6
+
+# Rate limiting / load shedding (tasks.ratelimit). Buckets live in the cache,
+# so configure a shared backend (Redis/Memcached) when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+RATE_LIMIT_ENABLED = True
+RATE_LIMIT_USER_BUDGET = {'capacity': 100, 'refill_per_second': 1.0}
+RATE_LIMIT_HEAVY_CONCURRENCY = 2
+
+# Per-request user context (tasks.context): the session, user, profile and team
+# ids are served from the cache and invalidated by the User/Profile signals.
+# Point USER_CONTEXT_CACHE at a shared backend (Redis, Memcached) in production;
+# with LocMemCache the authenticated user is always read from the database.
+AUTHENTICATION_BACKENDS = [
+    'tasks.auth.CachedModelBackend',
+    # Keeps sessions created before the cached backend valid
+    'django.contrib.auth.backends.ModelBackend',
+]
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+USER_CONTEXT_CACHE = 'default'
+USER_CONTEXT_TIMEOUT = 300
+
+# Assignee autocomplete (tasks.views.assignee_search) and user list paging
+ASSIGNEE_SEARCH_LIMIT = 10
+ASSIGNEE_SEARCH_CACHE_TIMEOUT = 30
+USER_LIST_PAGE_SIZE = 25
+
+# User deletion jobs (tasks.deletion). Jobs run in a background thread after the
+# request; with USER_DELETION_RUN_IN_THREAD = False they wait for
+# `python manage.py process_user_deletions --interval 10`.
+USER_DELETION_RUN_IN_THREAD = True
+USER_DELETION_BATCH_SIZE = 1000
+USER_DELETION_STALE_AFTER = 3600
+
+# Prometheus metrics at /metrics (tasks.metrics). With several worker processes,
+# point METRICS_MULTIPROCESS_DIR at a directory shared by all of them.
+METRICS_MULTIPROCESS_DIR = os.getenv('METRICS_MULTIPROCESS_DIR')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+METRICS_ALLOWED_IPS = ['127.0.0.1']
+
 ROOT_URLCONF = 'taskflow.urls'
 
 TEMPLATES = [
@@ -80,8 +131,19 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'tasks' / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Hashed filenames + prebuilt .gz/.br variants (python manage.py collectstatic)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'tasks.assets.CompressedManifestStaticFilesStorage',
+    },
+}
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = 'tasks.mail.InstrumentedSMTPBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.views.generic import RedirectView
 from tasks import views
+from tasks.assets import serve_static
 from django.contrib.auth import views as auth_views
 
 urlpatterns = [
@@ -10,3 +12,9 @@ urlpatterns = [
     path('', include('tasks.urls')),
     path('users/<int:user_id>/delete/', views.delete_user_view, name='delete_user'),
 ]
+
+if not settings.DEBUG:
+    # runserver serves static files itself in DEBUG; otherwise serve the collected, precompressed files
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), serve_static),
+    ]
@@ -0,0 +1,82 @@
+# Static asset pipeline: content-hashed filenames (ManifestStaticFilesStorage),
+# gzip + brotli variants written at collectstatic time, and a fallback view
+# that serves the precompressed variant with far-future cache headers.
+import gzip
+import os
+import re
+
+import brotli
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import Http404
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views import static
+
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.svg', '.json', '.txt', '.html', '.map')
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+ONE_YEAR = 60 * 60 * 24 * 365
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    min_compress_size = 256
+    # Names missing from the manifest are hashed on the fly instead of raising
+    manifest_strict = False
+
+    def stored_name(self, name):
+        # Nothing collected at all (the test runner, a fresh checkout with DEBUG off):
+        # fall back to the unhashed name rather than failing every page render
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for hashed_name in set(self.hashed_files.values()):
+            if not hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(hashed_name) as f:
+                content = f.read()
+            if len(content) < self.min_compress_size:
+                continue
+
+            variants = (
+                ('.gz', gzip.compress(content, compresslevel=9, mtime=0)),
+                ('.br', brotli.compress(content, quality=11)),
+            )
+            for suffix, compressed in variants:
+                # Only keep variants that actually save bytes
+                if len(compressed) < len(content):
+                    if self.exists(hashed_name + suffix):
+                        self.delete(hashed_name + suffix)
+                    self._save(hashed_name + suffix, ContentFile(compressed))
+                    yield hashed_name, hashed_name + suffix, True
+
+
+def serve_static(request, path):
+    # For deployments where Django itself serves STATIC_ROOT (no nginx / CDN in front)
+    accept_encoding = request.headers.get('Accept-Encoding', '')
+    served_path = path
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if encoding not in accept_encoding:
+            continue
+        try:
+            candidate = safe_join(settings.STATIC_ROOT, path + suffix)
+        except SuspiciousFileOperation:
+            raise Http404
+        if os.path.isfile(candidate):
+            served_path = path + suffix
+            break
+
+    # static.serve sets Content-Type from the original extension and Content-Encoding from the suffix
+    response = static.serve(request, served_path, document_root=settings.STATIC_ROOT)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if HASHED_NAME_RE.search(path):
+        patch_cache_control(response, public=True, max_age=ONE_YEAR, immutable=True)
+    return response
@@ -0,0 +1,22 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
+from .context import cache_is_shared, get_cached_user
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose per-request user lookup is served from tasks.context's cache."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username=username, password=password, **kwargs)
+        if user is None and password is not None:
+            # ModelBackend is listed after us only for older sessions; don't hash the password twice
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        if not cache_is_shared():
+            # Another worker's copy would outlive a password change or deactivation
+            return super().get_user(user_id)
+        user = get_cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -0,0 +1,160 @@
+# Multi-operation endpoint support: one round trip, one transaction, and a
+# user/profile/visibility context that is loaded once and shared by all ops.
+from django.db import DatabaseError, transaction
+from django.forms.models import model_to_dict
+
+from .forms import CommentForm, TaskForm
+from .context import team_member_ids
+from .models import Notification, Task, TaskOrder
+from .services import (
+    add_comment_to_task, bump_data_version, complete_task, save_task_form, visible_tasks
+)
+
+MAX_BATCH_OPERATIONS = 50
+# Upper bound of TaskOrder.position (a 32-bit integer column on every backend)
+MAX_POSITION = 2147483647
+
+
+class BatchError(Exception):
+    pass
+
+
+class BatchContext:
+    def __init__(self, user):
+        self.user = user
+        self.profile = user.profile
+        self.visible_tasks, self.employee_ids = visible_tasks(user, self.profile)
+        self._team_ids = None
+
+    @property
+    def team_ids(self):
+        # Same rule as task_update: managers may edit tasks created by themselves or their employees
+        if self._team_ids is None:
+            self._team_ids = {self.user.id} | team_member_ids(self.user.id)
+        return self._team_ids
+
+    def get_visible_task(self, task_id):
+        try:
+            return self.visible_tasks.select_related('assigned_to', 'created_by').get(pk=task_id)
+        except (Task.DoesNotExist, TypeError, ValueError):
+            raise BatchError('Task not found.')
+
+    def get_editable_task(self, task_id):
+        try:
+            task = Task.objects.select_related('assigned_to', 'created_by').get(pk=task_id)
+        except (Task.DoesNotExist, TypeError, ValueError):
+            raise BatchError('Task not found.')
+
+        if self.profile.role == 'Employee':
+            allowed = task.assigned_to_id == self.user.id
+        elif self.profile.role == 'Manager':
+            allowed = task.created_by_id in self.team_ids
+        else:
+            allowed = True
+        if not allowed:
+            raise BatchError('You do not have permission to modify this task.')
+        return task
+
+
+def _mark_done(ctx, op):
+    task = ctx.get_visible_task(op.get('task_id'))
+    if task.assigned_to_id != ctx.user.id:
+        raise BatchError('You do not have permission to modify this task.')
+    return {'completed': complete_task(task)}
+
+
+def _add_comment(ctx, op):
+    task = ctx.get_visible_task(op.get('task_id'))
+    form = CommentForm({'content': op.get('content', '')})
+    if not form.is_valid():
+        raise BatchError(form.errors.get_json_data())
+    comment = add_comment_to_task(task, ctx.user, form)
+    return {'comment_id': comment.id, 'comment_count': task.comment_count + 1}
+
+
+def _reorder(ctx, op):
+    try:
+        positions = {int(item['id']): int(item['order']) for item in op.get('order', [])}
+    except (KeyError, TypeError, ValueError):
+        raise BatchError('Invalid order payload.')
+    if any(not 0 <= position <= MAX_POSITION for position in positions.values()):
+        raise BatchError('Invalid order payload.')
+
+    task_ids = set(ctx.visible_tasks.filter(pk__in=positions).values_list('pk', flat=True))
+    existing = {
+        to.task_id: to
+        for to in TaskOrder.objects.filter(user=ctx.user, task_id__in=task_ids)
+    }
+    to_update, to_create = [], []
+    for task_id in task_ids:
+        if task_id in existing:
+            existing[task_id].position = positions[task_id]
+            to_update.append(existing[task_id])
+        else:
+            to_create.append(TaskOrder(user=ctx.user, task_id=task_id, position=positions[task_id]))
+
+    TaskOrder.objects.bulk_update(to_update, ['position'])
+    TaskOrder.objects.bulk_create(to_create)
+    bump_data_version([ctx.user.id])
+    return {'updated': len(task_ids)}
+
+
+def _dismiss_notification(ctx, op):
+    try:
+        notification_id = int(op.get('notification_id'))
+    except (TypeError, ValueError):
+        raise BatchError('Notification not found.')
+    deleted, _ = Notification.objects.filter(id=notification_id, user=ctx.user).delete()
+    if not deleted:
+        raise BatchError('Notification not found.')
+    return {}
+
+
+def _update_task(ctx, op):
+    task = ctx.get_editable_task(op.get('task_id'))
+    fields = op.get('fields')
+    if not isinstance(fields, dict):
+        raise BatchError('fields must be an object.')
+
+    data = model_to_dict(task, fields=TaskForm.Meta.fields)
+    data.update({name: value for name, value in fields.items() if name in TaskForm.Meta.fields})
+    form = TaskForm(data, instance=task)
+    if not form.is_valid():
+        raise BatchError(form.errors.get_json_data())
+    save_task_form(form)
+    return {}
+
+
+OPERATIONS = {
+    'mark_done': _mark_done,
+    'add_comment': _add_comment,
+    'reorder': _reorder,
+    'dismiss_notification': _dismiss_notification,
+    'update_task': _update_task,
+}
+
+
+@transaction.atomic
+def run_batch(user, operations):
+    ctx = BatchContext(user)
+    results = []
+    for op in operations:
+        name = op.get('op') if isinstance(op, dict) else None
+        if not isinstance(name, str):
+            name = None
+        handler = OPERATIONS.get(name)
+        if handler is None:
+            results.append({'op': name, 'success': False, 'error': 'Unknown operation.'})
+            continue
+        try:
+            # Savepoint per op, so one failure doesn't undo the rest of the batch
+            with transaction.atomic():
+                result = handler(ctx, op)
+        except BatchError as e:
+            results.append({'op': name, 'success': False, 'error': e.args[0]})
+        except DatabaseError:
+            # Constraint or range errors the handlers didn't anticipate; the savepoint is already undone
+            results.append({'op': name, 'success': False, 'error': 'The operation could not be saved.'})
+        else:
+            results.append({'op': name, 'success': True, **result})
+    return results
@@ -0,0 +1,99 @@
+# Cheap change markers driving ETag / Last-Modified on polled and list views.
+# Each marker is computed once per request and shared by the etag and
+# last-modified callbacks of django.views.decorators.http.condition.
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import Notification, Profile, Task
+from .services import visible_tasks
+
+
+def _make_etag(*parts):
+    return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def _per_request(func):
+    attr = f'_{func.__name__}'
+
+    @wraps(func)
+    def wrapper(request, *args, **kwargs):
+        if not hasattr(request, attr):
+            setattr(request, attr, func(request, *args, **kwargs))
+        return getattr(request, attr)
+    return wrapper
+
+
+def _page_parts(request, profile):
+    # Rendered pages embed the CSRF token and overdue flags, so both go into the marker
+    return (
+        profile.role, profile.manager_id, profile.data_version,
+        request.META.get('CSRF_COOKIE'), timezone.localdate(),
+    )
+
+
+@_per_request
+def notifications_marker(request):
+    stats = Notification.objects.filter(user=request.user).aggregate(
+        total=Count('id'),
+        unread=Count('id', filter=Q(read=False)),
+        last_id=Max('id'),
+        last_created=Max('created_at'),
+    )
+    etag = _make_etag(request.user.pk, stats['total'], stats['unread'], stats['last_id'])
+    return etag, stats['last_created']
+
+
+@_per_request
+def task_list_marker(request):
+    profile = request.user_context.profile
+    base_tasks, employee_ids = visible_tasks(request.user, profile)
+    stats = base_tasks.order_by().aggregate(total=Count('id'), last_activity=Max('last_activity_at'))
+    etag = _make_etag(
+        _page_parts(request, profile), sorted(employee_ids),
+        stats['total'], stats['last_activity'], request.GET.urlencode(),
+    )
+    return etag, stats['last_activity']
+
+
+@_per_request
+def dashboard_marker(request):
+    profile = request.user_context.profile
+    manager_id = profile.manager_id if profile.role == 'Employee' else request.user.pk
+    employee_ids = sorted(Profile.objects.filter(
+        manager_id=manager_id, role='Employee'
+    ).values_list('user_id', flat=True))
+    stats = Task.objects.filter(assigned_to__in=employee_ids).order_by().aggregate(
+        total=Count('id'), last_activity=Max('last_activity_at'),
+    )
+    etag = _make_etag(
+        _page_parts(request, profile), employee_ids,
+        stats['total'], stats['last_activity'], request.GET.get('employee'),
+    )
+    return etag, stats['last_activity']
+
+
+def notifications_etag(request):
+    return notifications_marker(request)[0]
+
+
+def notifications_last_modified(request):
+    return notifications_marker(request)[1]
+
+
+def task_list_etag(request):
+    return task_list_marker(request)[0]
+
+
+def task_list_last_modified(request):
+    return task_list_marker(request)[1]
+
+
+def dashboard_etag(request):
+    return dashboard_marker(request)[0]
+
+
+def dashboard_last_modified(request):
+    return dashboard_marker(request)[1]
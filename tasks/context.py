@@ -0,0 +1,103 @@
+# Per-request user context: the user (with its profile), role, manager and
+# team-member ids, loaded once per request and cached across requests.
+# Entries are dropped by the User/Profile signals in tasks.signals, so with
+# several worker processes USER_CONTEXT_CACHE must be a shared backend.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject, cached_property
+
+from .models import Profile
+
+USER_CONTEXT_TIMEOUT = 300
+
+
+def _cache():
+    return caches[getattr(settings, 'USER_CONTEXT_CACHE', 'default')]
+
+
+def cache_is_shared():
+    # A LocMemCache lives in one process, so the signals can't clear other workers' copies
+    return not isinstance(_cache(), LocMemCache)
+
+
+def _user_key(user_id):
+    return f'usercontext:user:{user_id}'
+
+
+def _team_key(manager_id):
+    return f'usercontext:team:{manager_id}'
+
+
+def get_cached_user(user_id):
+    # The profile is fetched in the same query, so user.profile costs nothing later
+    key = _user_key(user_id)
+    user = _cache().get(key)
+    if user is None:
+        user = User.objects.select_related('profile').filter(pk=user_id).first()
+        if user is None:
+            return None
+        _cache().set(key, user, getattr(settings, 'USER_CONTEXT_TIMEOUT', USER_CONTEXT_TIMEOUT))
+    return user
+
+
+def team_member_ids(manager_id):
+    """Ids of the users whose profile.manager is ``manager_id`` (None included, as the views use it)."""
+    key = _team_key(manager_id)
+    ids = _cache().get(key)
+    if ids is None:
+        ids = frozenset(Profile.objects.filter(manager_id=manager_id).values_list('user_id', flat=True))
+        _cache().set(key, ids, getattr(settings, 'USER_CONTEXT_TIMEOUT', USER_CONTEXT_TIMEOUT))
+    return ids
+
+
+def _delete(keys):
+    # Again after commit, in case another request re-cached the old rows meanwhile
+    _cache().delete_many(keys)
+    transaction.on_commit(lambda: _cache().delete_many(keys))
+
+
+def invalidate_users(user_ids):
+    _delete([_user_key(pk) for pk in user_ids])
+
+
+def invalidate_teams(manager_ids):
+    _delete([_team_key(pk) for pk in manager_ids])
+
+
+class UserContext:
+    def __init__(self, user):
+        self.user = user
+        self.profile = user.profile
+        self.role = self.profile.role
+        self.manager_id = self.profile.manager_id
+
+    @property
+    def is_manager(self):
+        return self.role == 'Manager'
+
+    @cached_property
+    def team_ids(self):
+        # Employees managed by this user (user.employees)
+        return team_member_ids(self.user.pk)
+
+    def can_manage(self, task):
+        # Managers handle tasks created by themselves or their employees
+        return task.created_by_id == self.user.pk or task.created_by_id in self.team_ids
+
+
+def get_user_context(user):
+    return UserContext(user) if user.is_authenticated else None
+
+
+class UserContextMiddleware:
+    """Sets request.user_context. Place it after AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.user_context = SimpleLazyObject(lambda: get_user_context(request.user))
+        return self.get_response(request)
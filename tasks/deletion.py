@@ -0,0 +1,190 @@
+# Set-based user deletion. Tasks are deleted, reassigned or archived with a
+# handful of UPDATE/DELETE statements, dependants go in batched raw deletes,
+# and the work runs as a UserDeletionJob outside the request (a background
+# thread, or `manage.py process_user_deletions`), with progress on the job row.
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .context import invalidate_teams, invalidate_users
+from .models import Comment, Notification, Profile, Task, TaskOrder, UserDeletionJob
+from .services import archive_tasks, comment_aggregates, delete_tasks
+
+
+class DeletionError(Exception):
+    pass
+
+
+def _in_batches(queryset, batch_size):
+    # Yields pk lists until the queryset is empty; each batch is its own short statement
+    queryset = queryset.order_by()
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        yield pks
+
+
+def _raw_delete(queryset, batch_size, progress):
+    model = queryset.model
+    for pks in _in_batches(queryset, batch_size):
+        progress(model._base_manager.filter(pk__in=pks)._raw_delete(queryset.db))
+
+
+def _hand_over_tasks(user_ids, target, archive, batch_size, progress):
+    owned = Task.all_objects.filter(Q(assigned_to__in=user_ids) | Q(created_by__in=user_ids))
+    if archive:
+        for pks in _in_batches(owned.filter(archived_at__isnull=True), batch_size):
+            archive_tasks(pks)
+
+    now = timezone.now()
+    moved = Task.all_objects.filter(assigned_to__in=user_ids).update(assigned_to=target, last_activity_at=now)
+    Task.all_objects.filter(created_by__in=user_ids).update(created_by=target)
+    progress(moved)
+    if moved:
+        Notification.objects.create(user=target, message=f"{moved} tasks were handed over to you from deleted users.")
+
+
+def _drop_comments(user_ids, batch_size, progress):
+    # Rebuild the denormalised counters on surviving tasks from the comments that will
+    # remain, before deleting; a retry after a crash in between just recomputes them
+    dropped = Comment.objects.filter(author__in=user_ids)
+    comment_count, last_comment_at = comment_aggregates(Comment.objects.exclude(author__in=user_ids))
+    task_ids = list(dropped.order_by().values_list('task_id', flat=True).distinct())
+    now = timezone.now()
+    for start in range(0, len(task_ids), batch_size):
+        # Moving last_activity_at also changes the task list's ETag
+        Task.all_objects.filter(pk__in=task_ids[start:start + batch_size]).update(
+            comment_count=Coalesce(comment_count, 0),
+            last_comment_at=last_comment_at,
+            last_activity_at=now,
+        )
+    _raw_delete(dropped, batch_size, progress)
+
+
+def delete_users(user_ids, task_action='delete', reassign_to=None, batch_size=1000, progress=None):
+    """
+    Delete ``user_ids`` and everything hanging off them without Django's
+    row-by-row collector. ``task_action`` is 'delete', 'reassign' or 'archive';
+    the latter two hand the tasks to ``reassign_to``. Safe to re-run.
+    """
+    progress = progress or (lambda rows: None)
+    user_ids = list(user_ids)
+
+    if task_action == 'delete':
+        owned = Task.all_objects.filter(Q(assigned_to__in=user_ids) | Q(created_by__in=user_ids))
+        for pks in _in_batches(owned, batch_size):
+            progress(delete_tasks(Task.all_objects.filter(pk__in=pks)))
+    else:
+        _hand_over_tasks(user_ids, reassign_to, task_action == 'archive', batch_size, progress)
+
+    _drop_comments(user_ids, batch_size, progress)
+    _raw_delete(Notification.objects.filter(user__in=user_ids), batch_size, progress)
+    _raw_delete(TaskOrder.objects.filter(user__in=user_ids), batch_size, progress)
+
+    # SET_NULL on profile.manager, done up front so the collector has nothing left to update
+    employee_ids = list(Profile.objects.filter(manager__in=user_ids).values_list('user_id', flat=True))
+    if employee_ids:
+        Profile.objects.filter(user_id__in=employee_ids).update(manager=None)
+        invalidate_users(employee_ids)
+        invalidate_teams(user_ids + [None])
+
+    # Only the users' own rows remain, so the regular delete (and its signals) is cheap now
+    deleted = 0
+    for user in User.objects.filter(pk__in=user_ids):
+        user.delete()
+        deleted += 1
+    return deleted
+
+
+def queue_user_deletion(users, requested_by, task_action='delete', reassign_to=None, reason='', send_email=False):
+    if task_action != 'delete' and reassign_to is None:
+        reassign_to = requested_by
+    job = UserDeletionJob.objects.create(
+        requested_by=requested_by,
+        user_ids=[u.pk for u in users],
+        task_action=task_action,
+        reassign_to=reassign_to,
+        reason=reason,
+        send_email=send_email,
+    )
+    if getattr(settings, 'USER_DELETION_RUN_IN_THREAD', True):
+        transaction.on_commit(lambda: threading.Thread(target=_run_in_thread, args=(job.pk,), daemon=True).start())
+    return job
+
+
+def _run_in_thread(job_id):
+    try:
+        run_deletion_job(job_id)
+    finally:
+        connections.close_all()
+
+
+def _claimable():
+    # Pending jobs, or Running ones whose worker died; deletion is idempotent so retrying is safe
+    stale = timezone.now() - timedelta(seconds=getattr(settings, 'USER_DELETION_STALE_AFTER', 3600))
+    return UserDeletionJob.objects.filter(Q(status='Pending') | Q(status='Running', started_at__lt=stale))
+
+
+def _claim(job_id):
+    return _claimable().filter(pk=job_id).update(status='Running', started_at=timezone.now(), error='') == 1
+
+
+def _send_goodbye_emails(recipients, reason):
+    if not recipients:
+        return
+    connection = get_connection(fail_silently=True)
+    messages = []
+    for username, email in recipients:
+        body = f"Dear {username},\n\nYour account has been deleted by a Manager."
+        if reason:
+            body += f"\n\nReason provided:\n{reason}"
+        body += "\n\nIf you have any questions, contact your administrator."
+        messages.append(EmailMessage(
+            "Your account has been deleted", body, 'admin@taskflow.local', [email], connection=connection,
+        ))
+    connection.send_messages(messages)
+
+
+def run_deletion_job(job_id, batch_size=None):
+    if not _claim(job_id):
+        return False
+    job = UserDeletionJob.objects.select_related('reassign_to', 'requested_by').get(pk=job_id)
+    batch_size = batch_size or getattr(settings, 'USER_DELETION_BATCH_SIZE', 1000)
+
+    def progress(rows):
+        UserDeletionJob.objects.filter(pk=job.pk).update(deleted_rows=F('deleted_rows') + rows)
+
+    try:
+        # reassign_to is SET_NULL, so the target may have been deleted since the job was queued
+        target = job.reassign_to or job.requested_by
+        if job.task_action != 'delete' and target is None:
+            raise DeletionError('The user to hand the tasks over to no longer exists.')
+
+        # Read just before deleting; the job row itself never stores names or emails
+        recipients = []
+        if job.send_email:
+            recipients = list(
+                User.objects.filter(pk__in=job.user_ids).exclude(email='').values_list('username', 'email')
+            )
+        delete_users(job.user_ids, job.task_action, target, batch_size, progress)
+        # Counted as a whole: a retried job may find some users already gone
+        UserDeletionJob.objects.filter(pk=job.pk).update(deleted_users=job.total_users)
+        _send_goodbye_emails(recipients, job.reason)
+    except Exception as exc:
+        UserDeletionJob.objects.filter(pk=job.pk).update(status='Failed', error=str(exc), finished_at=timezone.now())
+        raise
+    UserDeletionJob.objects.filter(pk=job.pk).update(status='Done', finished_at=timezone.now())
+    return True
+
+
+def run_pending_deletions(batch_size=None):
+    job_ids = _claimable().order_by('created_at').values_list('pk', flat=True)
+    return sum(run_deletion_job(job_id, batch_size) for job_id in list(job_ids))
@@ -2,10 +2,29 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from .models import Task
-from .models import Profile
 from django.core.exceptions import ValidationError
 from .models import Comment
+from .models import UserDeletionJob
 from django.conf import settings
+from django.urls import reverse
+from .services import BULK_FIELDS
+
+
+class AssigneeAutocomplete(forms.Widget):
+    """
+    Search box backed by the assignee_search endpoint (see base.js) instead of
+    a <select> listing the whole team. Submits the chosen user's id.
+    """
+    template_name = 'tasks/widgets/assignee_autocomplete.html'
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['search_url'] = reverse('assignee_search')
+        label = ''
+        if value not in (None, '') and str(value).isdigit():
+            label = User.objects.filter(pk=value).values_list('username', flat=True).first() or ''
+        context['widget']['label'] = label
+        return context
 
 class CommentForm(forms.ModelForm):
     content = forms.CharField(
@@ -27,6 +46,7 @@ class TaskForm(forms.ModelForm):
     class Meta:
         model = Task
         fields = ['title', 'description', 'due_date', 'priority', 'status', 'assigned_to']
+        widgets = {'assigned_to': AssigneeAutocomplete()}
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -50,6 +70,14 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 import re
 
+USERNAME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9_]+$')
+USERNAME_ERROR = "Username must start with a letter and contain only letters, numbers, and underscores."
+PASSWORD_ERROR = "Password must be at least 8 characters and include both letters and digits."
+
+
+def is_strong_password(password):
+    return bool(len(password) >= 8 and re.search(r'\d', password) and re.search(r'[A-Za-z]', password))
+
 class SignUpForm(UserCreationForm):
     email = forms.EmailField(required=True)
     manager_name = forms.CharField(
@@ -65,8 +93,8 @@ class SignUpForm(UserCreationForm):
 
     def clean_username(self):
         username = self.cleaned_data.get('username')
-        if not re.match(r'^[a-zA-Z][a-zA-Z0-9_]+$', username):
-            raise ValidationError("Username must start with a letter and contain only letters, numbers, and underscores.")
+        if not USERNAME_RE.match(username):
+            raise ValidationError(USERNAME_ERROR)
         if User.objects.filter(username=username).exists():
             raise ValidationError("Username already exists.")
         return username
@@ -82,8 +110,8 @@ class SignUpForm(UserCreationForm):
         password2 = self.cleaned_data.get('password2')
         if password1 and password2 and password1 != password2:
             raise ValidationError("Passwords don't match.")
-        if password1 and (len(password1) < 8 or not re.search(r'\d', password1) or not re.search(r'[A-Za-z]', password1)):
-            raise ValidationError("Password must be at least 8 characters and include both letters and digits.")
+        if password1 and not is_strong_password(password1):
+            raise ValidationError(PASSWORD_ERROR)
         return password2
 
     def clean_manager_name(self):
@@ -117,12 +145,11 @@ class SignUpForm(UserCreationForm):
             role = 'Employee'
 
         if commit:
-            user.save()
-            profile, _ = Profile.objects.get_or_create(user=user)
-            profile.role = role
+            # The create_profile signal inserts the Profile using these
+            user._profile_role = role
             if role == 'Employee' and manager_name and manager_name != invite_code:
-                profile.manager = User.objects.get(username=manager_name)
-            profile.save()
+                user._profile_manager = User.objects.get(username=manager_name)
+            user.save()
 
         return user
 
@@ -146,6 +173,11 @@ class SearchForm(forms.Form):
         required=False,
         widget=forms.Select(attrs={'class': 'form-select'})
     )
+    sort = forms.ChoiceField(
+        choices=[('', 'My order'), ('activity', 'Recent activity')],
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
 from django import forms
 
 
@@ -163,9 +195,121 @@ class UserDeleteForm(forms.Form):
     send_email = forms.BooleanField(
         required=False,
         initial=True,
-        label="Send email notification to the user, Takes few Seconds",
+        label="Send email notification to the user",
         widget=forms.CheckboxInput(attrs={
             'class': 'form-check-input',
             'style': 'margin-left: 0;',  # Adjust checkbox spacing if needed
         })
-    )
\ No newline at end of file
+    )
+    task_action = forms.ChoiceField(
+        choices=UserDeletionJob.TASK_ACTION_CHOICES,
+        initial='delete',
+        label="Their tasks",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    reassign_to = forms.ModelChoiceField(
+        queryset=User.objects.none(),
+        required=False,
+        label="Hand tasks over to (defaults to you)",
+        widget=AssigneeAutocomplete(attrs={'class': 'form-control'})
+    )
+
+    def __init__(self, *args, reassign_candidates=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if reassign_candidates is not None:
+            self.fields['reassign_to'].queryset = reassign_candidates
+
+    def deletion_options(self):
+        return {
+            'task_action': self.cleaned_data['task_action'],
+            'reassign_to': self.cleaned_data.get('reassign_to'),
+            'reason': self.cleaned_data.get('reason', '').strip(),
+            'send_email': self.cleaned_data.get('send_email', False),
+        }
+
+
+class IdListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return [int(v) for v in value]
+        except (TypeError, ValueError):
+            raise ValidationError("Invalid selection.")
+
+
+class BulkTaskForm(forms.Form):
+    ACTION_CHOICES = [
+        ('reassign', 'Reassign'),
+        ('priority', 'Change priority'),
+        ('status', 'Change status'),
+        ('due_date', 'Change due date'),
+        ('delete', 'Delete'),
+    ]
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES, widget=forms.Select(attrs={'class': 'form-select'}))
+    task_ids = IdListField(required=False)
+    apply_to_filter = forms.BooleanField(
+        required=False,
+        label="Apply to all tasks matching the current search",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    assigned_to = forms.ModelChoiceField(
+        queryset=User.objects.none(),
+        required=False,
+        widget=AssigneeAutocomplete(attrs={'class': 'form-control'})
+    )
+    priority = forms.ChoiceField(
+        choices=[('', '---')] + Task.PRIORITY_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    status = forms.ChoiceField(
+        choices=[('', '---')] + Task.STATUS_CHOICES + [('Completed', 'Completed')],
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    due_date = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+
+    def __init__(self, *args, employees=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if employees is not None:
+            self.fields['assigned_to'].queryset = employees
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get('action')
+        value_field = BULK_FIELDS.get(action)
+        if value_field and not cleaned_data.get(value_field):
+            self.add_error(value_field, "This field is required for the selected action.")
+        if not cleaned_data.get('apply_to_filter') and not cleaned_data.get('task_ids'):
+            raise ValidationError("Select at least one task or apply to the current search.")
+        return cleaned_data
+
+    def action_value(self):
+        value_field = BULK_FIELDS.get(self.cleaned_data['action'])
+        return self.cleaned_data[value_field] if value_field else None
+
+
+class EmployeeImportForm(forms.Form):
+    csv_file = forms.FileField(
+        label="Employees CSV",
+        help_text="Columns: username, email, password (leave password empty to let the employee use Forgot password).",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control rounded', 'accept': '.csv'})
+    )
+
+
+class BulkUserDeleteForm(UserDeleteForm):
+    user_ids = IdListField()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        reassign_to = cleaned_data.get('reassign_to')
+        if reassign_to and reassign_to.pk in cleaned_data.get('user_ids', []):
+            raise ValidationError("Tasks can't be handed over to a user who is being deleted.")
+        return cleaned_data
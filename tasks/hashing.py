@@ -0,0 +1,15 @@
+# Process-pool workers for tasks.provisioning. Kept free of import-time Django
+# dependencies: forkserver/spawn children import this module before
+# init_worker has set Django up.
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def hash_password(password):
+    from django.contrib.auth.hashers import make_password
+
+    # None gives an unusable password; the employee sets one via Forgot password
+    return make_password(password or None)
@@ -0,0 +1,13 @@
+from django.core.mail.backends.smtp import EmailBackend
+
+from .metrics import registry, timer
+
+
+class InstrumentedSMTPBackend(EmailBackend):
+    """SMTP backend that records send latency and volume in tasks.metrics."""
+
+    def send_messages(self, email_messages):
+        with timer('taskflow_email_send_seconds'):
+            sent = super().send_messages(email_messages)
+        registry.inc('taskflow_emails_sent_total', value=sent or 0)
+        return sent
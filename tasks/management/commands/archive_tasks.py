@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.services import archive_tasks
+
+
+class Command(BaseCommand):
+    help = 'Archive tasks that were completed more than N days ago, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Tasks completed before completed_at existed fall back to their last activity
+        candidates = Task.objects.annotate(
+            finished_at=Coalesce('completed_at', 'last_activity_at')
+        ).filter(status='Completed', finished_at__lt=cutoff).order_by('pk')
+
+        if options['dry_run']:
+            self.stdout.write(f'{candidates.count()} tasks would be archived.')
+            return
+
+        archived = 0
+        while True:
+            batch = list(candidates.values_list('pk', flat=True)[:options['batch_size']])
+            if not batch:
+                break
+            archived += archive_tasks(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} tasks completed before {cutoff:%Y-%m-%d}.'))
@@ -0,0 +1,65 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from django.urls import resolve, reverse
+
+from tasks.context import get_user_context
+from tasks.middleware import Compressor
+
+
+class Command(BaseCommand):
+    help = 'Measure CPU cost vs bytes saved of brotli/gzip levels on real TaskFlow payloads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username whose pages are rendered.')
+        parser.add_argument('--urls', nargs='*', default=None,
+                            help='Paths to render (default: notifications API, task list, dashboard).')
+        parser.add_argument('--files', nargs='*', default=[], help='Extra payload files to include.')
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def _render(self, user, path):
+        request = RequestFactory().get(path, HTTP_HOST='localhost')
+        request.user = user
+        request.user_context = get_user_context(user)
+        match = resolve(request.path_info)
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def _time(self, coding, level, payload, iterations):
+        # Compressor reads the level from settings; override per run
+        key = 'COMPRESSION_BROTLI_QUALITY' if coding == 'br' else 'COMPRESSION_GZIP_LEVEL'
+        with override_settings(**{key: level}):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                compressed = Compressor(coding).compress(payload)
+            elapsed = (time.perf_counter() - start) / iterations
+        return len(compressed), elapsed
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        paths = options['urls'] or [reverse('notifications_api'), reverse('task_list'), reverse('dashboard')]
+        payloads = [(path, self._render(user, path)) for path in paths]
+        for name in options['files']:
+            with open(name, 'rb') as f:
+                payloads.append((name, f.read()))
+
+        levels = [('gzip', level) for level in (1, 6, 9)] + [('br', quality) for quality in (1, 4, 6, 11)]
+        self.stdout.write(f"{'payload':32} {'bytes':>9} {'codec':>8} {'out':>9} {'saved':>7} {'ms/op':>8} {'MB/s':>8}")
+        for name, payload in payloads:
+            if not payload:
+                continue
+            for coding, level in levels:
+                size, seconds = self._time(coding, level, payload, options['iterations'])
+                self.stdout.write(
+                    f"{name[:32]:32} {len(payload):>9} {coding + '-' + str(level):>8} {size:>9} "
+                    f"{100 * (1 - size / len(payload)):>6.1f}% {seconds * 1000:>8.3f} "
+                    f"{len(payload) / seconds / 1e6 if seconds else 0:>8.1f}"
+                )
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.deletion import run_pending_deletions
+
+
+class Command(BaseCommand):
+    help = 'Run queued user deletion jobs, including ones left behind by a crashed worker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and check for jobs every N seconds instead of once.')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = run_pending_deletions(options['batch_size'])
+            if processed or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(f'Processed {processed} user deletion jobs.'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
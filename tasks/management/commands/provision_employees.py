@@ -0,0 +1,36 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.provisioning import provision_employees, read_employee_csv, validate_employee_rows
+
+
+class Command(BaseCommand):
+    help = 'Create employees from a CSV file (username, email, password) under the given manager.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--manager', required=True, help="Manager's username.")
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processes used for password hashing (default: CPU count).')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Only validate the file.')
+
+    def handle(self, *args, **options):
+        try:
+            manager = User.objects.get(username=options['manager'], profile__role='Manager')
+        except User.DoesNotExist:
+            raise CommandError(f"Manager '{options['manager']}' does not exist.")
+
+        with open(options['csv_path'], newline='', encoding='utf-8-sig') as f:
+            rows = read_employee_csv(f)
+
+        if options['dry_run']:
+            errors = validate_employee_rows(rows, options['batch_size'])
+            users = rows
+        else:
+            users, errors = provision_employees(rows, manager, options['workers'], options['batch_size'])
+
+        if errors:
+            raise CommandError('No employees were created:\n' + '\n'.join(errors))
+        verb = 'would be created' if options['dry_run'] else 'created'
+        self.stdout.write(self.style.SUCCESS(f'{len(users)} employees {verb} under {manager.username}.'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce, Greatest
+
+from tasks.models import Task
+from tasks.services import comment_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalised comment_count / last_comment_at / last_activity_at fields on Task.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        comment_count, last_comment_at = comment_aggregates()
+
+        task_ids = list(Task.all_objects.order_by('pk').values_list('pk', flat=True))
+        updated = 0
+        for start in range(0, len(task_ids), batch_size):
+            batch = task_ids[start:start + batch_size]
+            with transaction.atomic():
+                updated += Task.all_objects.filter(pk__in=batch).update(
+                    comment_count=Coalesce(comment_count, 0),
+                    last_comment_at=last_comment_at,
+                    # Keep edit activity we can't reconstruct, but never fall behind the newest comment
+                    last_activity_at=Greatest(
+                        Coalesce(F('last_activity_at'), F('created_at')),
+                        Coalesce(last_comment_at, F('created_at')),
+                    ),
+                )
+
+        self.stdout.write(self.style.SUCCESS(f'Recomputed activity counters for {updated} tasks.'))
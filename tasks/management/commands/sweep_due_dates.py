@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.reminders import sweep_due_dates
+
+
+class Command(BaseCommand):
+    help = 'Notify assignees about overdue and due-soon tasks. Safe to re-run and to run on several workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reminder-days', type=int, default=1,
+                            help='Remind about tasks due within this many days.')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and sweep every N seconds instead of once (e.g. when no cron is available).')
+
+    def handle(self, *args, **options):
+        while True:
+            counts = sweep_due_dates(options['reminder_days'], options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Flagged {counts['overdue']} overdue tasks, sent {counts['reminders']} reminders."
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,178 @@
+# In-process metrics registry with Prometheus text exposition.
+# Counters and histograms are updated under a lock (safe across threads).
+# With METRICS_MULTIPROCESS_DIR set, each worker periodically writes a snapshot
+# there and /metrics sums every worker's snapshot, so any worker can be scraped.
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'taskflow_http_requests_total': ('counter', 'HTTP requests by view, method and status.', None),
+    'taskflow_http_request_duration_seconds': ('histogram', 'Request latency by view.', LATENCY_BUCKETS),
+    'taskflow_db_queries_total': ('counter', 'Database queries executed, by view.', None),
+    'taskflow_db_queries_per_request': ('histogram', 'Database queries per request, by view.', QUERY_COUNT_BUCKETS),
+    'taskflow_pdf_render_seconds': ('histogram', 'Time spent rendering PDF exports.', LATENCY_BUCKETS),
+    'taskflow_chart_render_seconds': ('histogram', 'Time spent rendering chart images.', LATENCY_BUCKETS),
+    'taskflow_email_send_seconds': ('histogram', 'Time spent handing a batch of emails to the mail server.', LATENCY_BUCKETS),
+    'taskflow_emails_sent_total': ('counter', 'Emails sent.', None),
+}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._last_flush = 0.0
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, tuple(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        buckets = METRICS[name][2]
+        key = (name, tuple(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist[0][i] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[n, list(l), v] for (n, l), v in self._counters.items()],
+                'histograms': [[n, list(l), [list(h[0]), h[1], h[2]]] for (n, l), h in self._histograms.items()],
+            }
+
+    def flush(self, force=False):
+        directory = getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+        now = time.monotonic()
+        if not directory or (not force and now - self._last_flush < getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)):
+            return
+        self._last_flush = now
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        # A missing or read-only directory must not turn every request into a 500
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.exception('Could not write metrics snapshot to %s', directory)
+
+
+registry = Registry()
+
+
+def _collect():
+    # Sum this process' live values with every other worker's latest snapshot
+    directory = getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+    if directory:
+        registry.flush(force=True)
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            logger.exception('Could not read metrics snapshots from %s', directory)
+            names = []
+        # This process' own values even if its snapshot couldn't be written
+        own = f'{os.getpid()}.json'
+        snapshots = [] if own in names else [registry.snapshot()]
+        for name in names:
+            if name.endswith('.json'):
+                try:
+                    with open(os.path.join(directory, name)) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+    else:
+        snapshots = [registry.snapshot()]
+
+    counters, histograms = {}, {}
+    for snap in snapshots:
+        for name, labels, value in snap['counters']:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, (bucket_counts, total, count) in snap['histograms']:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            merged = histograms.setdefault(key, [[0] * len(bucket_counts), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], bucket_counts)]
+            merged[1] += total
+            merged[2] += count
+    return counters, histograms
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _gauges():
+    # Evaluated at scrape time; use rate() on the row count for table growth
+    from .models import Notification
+
+    if connection.vendor == 'postgresql':
+        # Planner estimate: avoids a full count(*) on a large table
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [Notification._meta.db_table])
+            row = cursor.fetchone()
+        rows = max(row[0], 0) if row else 0
+    else:
+        rows = Notification.objects.count()
+    return [('taskflow_notifications_rows', 'Approximate number of rows in the notification table.', rows)]
+
+
+def render_prometheus():
+    counters, histograms = _collect()
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {value}')
+        else:
+            for (metric, labels), (bucket_counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, bucket_count in zip(buckets, bucket_counts):
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {bucket_count}')
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+    for name, help_text, value in _gauges():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def timer(name, labels=()):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start, labels)
+
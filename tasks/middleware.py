@@ -0,0 +1,147 @@
+import re
+import time
+import zlib
+
+import brotli
+from django.conf import settings
+from django.db import connection
+from django.utils.cache import patch_vary_headers
+
+from .metrics import registry
+
+DEFAULT_COMPRESSIBLE_TYPES = (
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'text/javascript',
+    'application/json', 'application/javascript', 'image/svg+xml',
+)
+
+_ACCEPT_RE = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q=([0-9.]+))?')
+
+
+def parse_accept_encoding(header):
+    codings = {}
+    for part in header.split(','):
+        match = _ACCEPT_RE.match(part)
+        if match:
+            try:
+                codings[match.group(1).lower()] = float(match.group(2) or 1)
+            except ValueError:
+                continue
+    return codings
+
+
+def choose_encoding(header):
+    codings = parse_accept_encoding(header)
+    # Prefer brotli when the client accepts both
+    for coding in ('br', 'gzip'):
+        if codings.get(coding, codings.get('*', 0)) > 0:
+            return coding
+    return None
+
+
+class Compressor:
+    def __init__(self, coding):
+        self.coding = coding
+        if coding == 'br':
+            self._obj = brotli.Compressor(quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4))
+        else:
+            self._obj = zlib.compressobj(getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self.process(data) + self.finish()
+
+    def process(self, data):
+        return self._obj.process(data) if self.coding == 'br' else self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush() if self.coding == 'br' else self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.finish() if self.coding == 'br' else self._obj.flush(zlib.Z_FINISH)
+
+    def stream(self, chunks):
+        # Flush after every chunk so the client gets data as soon as the view yields it
+        for chunk in chunks:
+            data = self.process(chunk) + self.flush()
+            if data:
+                yield data
+        yield self.finish()
+
+
+class CompressionMiddleware:
+    """
+    Brotli/gzip response compression negotiated from Accept-Encoding.
+
+    Settings: COMPRESSION_MIN_SIZE, COMPRESSION_CONTENT_TYPES,
+    COMPRESSION_BROTLI_QUALITY, COMPRESSION_GZIP_LEVEL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 200)
+        self.content_types = tuple(getattr(settings, 'COMPRESSION_CONTENT_TYPES', DEFAULT_COMPRESSIBLE_TYPES))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or response.status_code < 200 or response.status_code in (204, 304):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in self.content_types:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if coding is None:
+            return response
+
+        compressor = Compressor(coding)
+        if response.streaming:
+            if response.is_async:
+                return response
+            response.streaming_content = compressor.stream(response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            if len(response.content) < self.min_size:
+                return response
+            compressed = compressor.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The body bytes changed, so a strong ETag is no longer accurate
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = coding
+        return response
+
+
+class MetricsMiddleware:
+    """Records per-view latency and DB query counts. Keep it first in MIDDLEWARE."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.func.__name__) if match else 'unmatched'
+        registry.inc('taskflow_http_requests_total', [('view', view), ('method', request.method), ('status', response.status_code)])
+        registry.observe('taskflow_http_request_duration_seconds', elapsed, [('view', view)])
+        registry.inc('taskflow_db_queries_total', [('view', view)], queries[0])
+        registry.observe('taskflow_db_queries_per_request', queries[0], [('view', view)])
+        registry.flush()
+        return response
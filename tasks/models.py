@@ -1,6 +1,7 @@
 # models.py
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Profile(models.Model):
     ROLE_CHOICES = (
@@ -12,10 +13,24 @@ class Profile(models.Model):
     manager = models.ForeignKey(
         User, null=True, blank=True, on_delete=models.SET_NULL, related_name='employees'
     )
+    # Bumped on per-user changes that leave no timestamp behind (e.g. task reordering)
+    data_version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.user.username} ({self.role})"
         
+class TaskQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(archived_at__isnull=True)
+
+    def archived(self):
+        return self.filter(archived_at__isnull=False)
+
+class ActiveTaskManager(models.Manager.from_queryset(TaskQuerySet)):
+    # Default manager: archived tasks are excluded unless Task.all_objects is used
+    def get_queryset(self):
+        return super().get_queryset().active()
+
 class Task(models.Model):
     PRIORITY_CHOICES = [('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')]
     STATUS_CHOICES = [('Pending', 'Pending')]
@@ -31,8 +46,46 @@ class Task(models.Model):
 
     order = models.PositiveIntegerField(default=0)  # new field for task order
 
+    # Denormalised activity counters, kept in sync by tasks.services
+    comment_count = models.PositiveIntegerField(default=0)
+    last_comment_at = models.DateTimeField(null=True, blank=True)
+    last_activity_at = models.DateTimeField(default=timezone.now)
+
+    completed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(null=True, blank=True)
+
+    # Set by the due-date sweeper so each task is notified once per due date
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)
+    overdue_notified_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveTaskManager()
+    all_objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['order']  # default ordering by order field
+        # Partial indexes only cover the hot (non-archived) rows
+        indexes = [
+            models.Index(
+                fields=['created_by', '-last_activity_at'], name='task_creator_activity_idx',
+                condition=models.Q(archived_at__isnull=True),
+            ),
+            models.Index(
+                fields=['assigned_to', '-last_activity_at'], name='task_assignee_activity_idx',
+                condition=models.Q(archived_at__isnull=True),
+            ),
+            models.Index(
+                fields=['status', 'completed_at'], name='task_archivable_idx',
+                condition=models.Q(archived_at__isnull=True),
+            ),
+            models.Index(
+                fields=['due_date'], name='task_pending_due_idx',
+                condition=models.Q(status='Pending', archived_at__isnull=True),
+            ),
+            models.Index(
+                fields=['created_by', '-archived_at'], name='task_archive_idx',
+                condition=models.Q(archived_at__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -44,6 +97,11 @@ class Notification(models.Model):
     read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"Notification for {self.user.username}: {self.message}"
 class Comment(models.Model):
@@ -66,3 +124,45 @@ class TaskOrder(models.Model):
     class Meta:
         unique_together = ('user', 'task')
         ordering = ['position']
+
+class UserDeletionJob(models.Model):
+    # Queued by the delete-user views and run by tasks.deletion, outside the request
+    STATUS_CHOICES = [
+        ('Pending', 'Pending'),
+        ('Running', 'Running'),
+        ('Done', 'Done'),
+        ('Failed', 'Failed'),
+    ]
+    TASK_ACTION_CHOICES = [
+        ('delete', 'Delete their tasks'),
+        ('reassign', 'Reassign their tasks'),
+        ('archive', 'Archive and reassign their tasks'),
+    ]
+
+    requested_by = models.ForeignKey(User, null=True, on_delete=models.SET_NULL, related_name='+')
+    # Ids only, so no personal data outlives the deleted accounts
+    user_ids = models.JSONField()
+    task_action = models.CharField(max_length=10, choices=TASK_ACTION_CHOICES, default='delete')
+    reassign_to = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    reason = models.TextField(blank=True)
+    send_email = models.BooleanField(default=False)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Pending')
+    deleted_users = models.PositiveIntegerField(default=0)
+    deleted_rows = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='userdeletion_status_idx'),
+        ]
+
+    @property
+    def total_users(self):
+        return len(self.user_ids)
+
+    def __str__(self):
+        return f"Deletion of {self.total_users} users ({self.status})"
@@ -0,0 +1,106 @@
+# Bulk employee provisioning from CSV: validate in batches, hash passwords
+# across a process pool, and insert User + Profile rows with bulk_create.
+import csv
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .context import invalidate_teams
+from .forms import USERNAME_ERROR, USERNAME_RE, PASSWORD_ERROR, is_strong_password
+from .hashing import hash_password, init_worker
+from .models import Profile
+
+# Below this many passwords the pool start-up costs more than it saves
+PARALLEL_HASH_THRESHOLD = 8
+
+
+def hash_passwords(passwords, workers=None):
+    if len(passwords) < PARALLEL_HASH_THRESHOLD or workers == 1:
+        return [hash_password(p) for p in passwords]
+    # Not fork: forking a threaded web worker can deadlock the child on an inherited lock.
+    # forkserver where available, spawn otherwise (Windows)
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    context = multiprocessing.get_context(start_method)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=context, initializer=init_worker) as pool:
+        return list(pool.map(hash_password, passwords, chunksize=4))
+
+
+def read_employee_csv(file):
+    if isinstance(file, (bytes, bytearray)):
+        file = io.StringIO(file.decode('utf-8-sig'))
+    reader = csv.DictReader(file)
+    return [
+        {
+            'username': (row.get('username') or '').strip(),
+            'email': (row.get('email') or '').strip(),
+            'password': row.get('password') or '',
+        }
+        for row in reader
+    ]
+
+
+def validate_employee_rows(rows, batch_size=500):
+    errors = []
+    seen_usernames, seen_emails = set(), set()
+
+    for line, row in enumerate(rows, start=2):  # line 1 is the header
+        if not USERNAME_RE.match(row['username']):
+            errors.append(f"Line {line}: {USERNAME_ERROR}")
+        try:
+            validate_email(row['email'])
+        except ValidationError:
+            errors.append(f"Line {line}: Enter a valid email address.")
+        if row['password'] and not is_strong_password(row['password']):
+            errors.append(f"Line {line}: {PASSWORD_ERROR}")
+        if row['username'].lower() in seen_usernames:
+            errors.append(f"Line {line}: Duplicate username '{row['username']}' in file.")
+        if row['email'].lower() in seen_emails:
+            errors.append(f"Line {line}: Duplicate email '{row['email']}' in file.")
+        seen_usernames.add(row['username'].lower())
+        seen_emails.add(row['email'].lower())
+
+    # One query per batch for clashes with existing accounts
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        usernames = [r['username'] for r in batch]
+        emails = [r['email'].lower() for r in batch]
+        for username, email in User.objects.annotate(email_lower=Lower('email')).filter(
+            Q(username__in=usernames) | Q(email_lower__in=emails)
+        ).values_list('username', 'email'):
+            if username in usernames:
+                errors.append(f"Username '{username}' already exists.")
+            if email.lower() in emails:
+                errors.append(f"Email '{email}' is already registered.")
+    return errors
+
+
+def provision_employees(rows, manager, workers=None, batch_size=500):
+    """Create employees under ``manager``. Returns (users, errors); nothing is created if any row is invalid."""
+    errors = validate_employee_rows(rows, batch_size)
+    if errors:
+        return [], errors
+
+    hashes = hash_passwords([r['password'] for r in rows], workers)
+    users = [
+        User(username=r['username'], email=r['email'], password=h, is_staff=False, is_superuser=False)
+        for r, h in zip(rows, hashes)
+    ]
+
+    # bulk_create skips post_save, so create_profile doesn't fire and each Profile is written once
+    with transaction.atomic():
+        users = User.objects.bulk_create(users, batch_size=batch_size)
+        Profile.objects.bulk_create(
+            [Profile(user=u, role='Employee', manager=manager) for u in users],
+            batch_size=batch_size,
+        )
+    # No signals fired, so refresh the manager's cached team
+    invalidate_teams([manager.pk])
+    return users, []
@@ -0,0 +1,156 @@
+# Rate limiting and load shedding, backed by the Django cache.
+# Every user has a shared budget that endpoints draw from by weighted cost,
+# plus a per-endpoint burst limit; heavy renders also share a global
+# concurrency cap so excess requests fail fast instead of queueing.
+# All checks reserve with cache.incr and give back with decr, so concurrent
+# requests can't both spend the same tokens. Use a shared cache
+# (Redis/Memcached) so limits hold across worker processes.
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+HEAVY_INFLIGHT_KEY = 'ratelimit:heavy:inflight'
+
+
+def _cache():
+    return caches[getattr(settings, 'RATE_LIMIT_CACHE', 'default')]
+
+
+def _incr(key, delta, timeout):
+    cache = _cache()
+    for _ in range(2):
+        cache.add(key, 0, timeout=timeout)
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            # Expired between add() and incr(); create it again
+            continue
+    return delta
+
+
+class TokenBucket:
+    """
+    ``capacity`` tokens refilled at ``refill_per_second``, approximated with a
+    sliding window of integer counters (one per ``capacity / rate`` seconds)
+    so spending is a single atomic incr.
+    """
+
+    def __init__(self, key, capacity, refill_per_second):
+        self.key = key
+        self.capacity = capacity
+        self.window = capacity / refill_per_second
+
+    def _keys(self, now):
+        index = int(now // self.window)
+        return f'{self.key}:{index}', f'{self.key}:{index - 1}', now / self.window - index
+
+    def try_consume(self, cost, now):
+        """Spend ``cost`` tokens. Returns 0 on success, else seconds to wait (nothing is spent)."""
+        cost = min(cost, self.capacity)
+        current_key, previous_key, elapsed = self._keys(now)
+        previous = _cache().get(previous_key, 0)
+        used = _incr(current_key, cost, timeout=math.ceil(2 * self.window) + 1)
+        # The previous window still counts for the part of it inside the sliding window
+        excess = previous * (1 - elapsed) + used - self.capacity
+        if excess <= 0:
+            return 0
+        self.refund(cost, now)
+        wait = (1 - elapsed) * self.window
+        if previous:
+            wait = min(wait, excess / previous * self.window)
+        return wait
+
+    def refund(self, cost, now):
+        try:
+            _cache().decr(self._keys(now)[0], min(cost, self.capacity))
+        except ValueError:
+            pass
+
+
+def _client_key(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def _reject(request, status, retry_after, message):
+    retry_after = max(1, math.ceil(retry_after))
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest' or request.path.startswith(('/api/', '/notifications/')):
+        response = JsonResponse({'success': False, 'error': message}, status=status)
+    else:
+        response = HttpResponse(message, status=status, content_type='text/plain')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def _acquire_heavy_slot():
+    cache = _cache()
+    limit = getattr(settings, 'RATE_LIMIT_HEAVY_CONCURRENCY', 2)
+    # The timeout lets a slot leaked by a crashed worker expire on its own
+    cache.add(HEAVY_INFLIGHT_KEY, 0, timeout=300)
+    try:
+        inflight = cache.incr(HEAVY_INFLIGHT_KEY)
+    except ValueError:
+        cache.set(HEAVY_INFLIGHT_KEY, 1, timeout=300)
+        inflight = 1
+    if inflight > limit:
+        _release_heavy_slot()
+        return False
+    return True
+
+
+def _release_heavy_slot():
+    try:
+        _cache().decr(HEAVY_INFLIGHT_KEY)
+    except ValueError:
+        pass
+
+
+def rate_limit(cost=1, burst=None, per=None, heavy=False, methods=None):
+    """
+    Charge ``cost`` tokens from the user's budget (RATE_LIMIT_USER_BUDGET) and,
+    if ``burst``/``per`` are given, allow at most ``burst`` calls per ``per``
+    seconds to this view. ``heavy`` views also count against
+    RATE_LIMIT_HEAVY_CONCURRENCY. ``methods`` limits which HTTP methods are charged.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, 'RATE_LIMIT_ENABLED', True) or (methods and request.method not in methods):
+                return view_func(request, *args, **kwargs)
+
+            client = _client_key(request)
+            budget = getattr(settings, 'RATE_LIMIT_USER_BUDGET', {'capacity': 100, 'refill_per_second': 1.0})
+            buckets = [(TokenBucket(f'ratelimit:budget:{client}', budget['capacity'], budget['refill_per_second']), cost)]
+            if burst and per:
+                buckets.append((TokenBucket(f'ratelimit:{view_func.__name__}:{client}', burst, burst / per), 1))
+
+            now = time.time()
+            spent = []
+
+            def refund():
+                for spent_bucket, spent_cost in spent:
+                    spent_bucket.refund(spent_cost, now)
+
+            for bucket, bucket_cost in buckets:
+                wait = bucket.try_consume(bucket_cost, now)
+                if wait:
+                    # Give back what the earlier buckets already reserved
+                    refund()
+                    return _reject(request, 429, wait, 'Too many requests, please slow down.')
+                spent.append((bucket, bucket_cost))
+
+            if heavy and not _acquire_heavy_slot():
+                refund()
+                return _reject(request, 503, 5, 'Server is busy, please try again shortly.')
+            try:
+                return view_func(request, *args, **kwargs)
+            finally:
+                if heavy:
+                    _release_heavy_slot()
+        return wrapper
+    return decorator
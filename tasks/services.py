@@ -0,0 +1,219 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .context import invalidate_users, team_member_ids
+from .models import Comment, Notification, Profile, Task, TaskOrder
+
+
+def record_comment(task_id, when=None):
+    # Bump the denormalised comment counters in a single UPDATE
+    when = when or timezone.now()
+    Task.objects.filter(pk=task_id).update(
+        comment_count=F('comment_count') + 1,
+        last_comment_at=when,
+        last_activity_at=when,
+    )
+
+
+def comment_aggregates(comments=None):
+    # Correlated subqueries giving a task's comment count and newest comment time,
+    # for UPDATEs that rebuild the denormalised counters from ``comments``
+    comments = Comment.objects.all() if comments is None else comments
+    per_task = comments.filter(task=OuterRef('pk')).order_by().values('task')
+    comment_count = Subquery(per_task.annotate(c=Count('id')).values('c'), output_field=IntegerField())
+    last_comment_at = Subquery(per_task.annotate(m=Max('created_at')).values('m'))
+    return comment_count, last_comment_at
+
+
+def record_task_activity(task_id, when=None):
+    Task.objects.filter(pk=task_id).update(last_activity_at=when or timezone.now())
+
+
+@transaction.atomic
+def add_comment_to_task(task, author, form):
+    comment = form.save(commit=False)
+    comment.author = author
+    comment.task = task
+    comment.save()
+    record_comment(task.pk, comment.created_at)
+    return comment
+
+
+def complete_task(task):
+    if task.status == 'Completed':
+        return False
+
+    task.status = 'Completed'
+    task.completed_at = timezone.now()
+    task.save(update_fields=['status', 'completed_at'])
+    record_task_activity(task.pk)
+
+    try:
+        employee_profile = Profile.objects.get(user=task.assigned_to)
+        manager = employee_profile.manager
+    except Profile.DoesNotExist:
+        manager = None
+
+    if manager:
+        Notification.objects.create(
+            user=manager,
+            message=f"Task '{task.title}' was completed by {task.assigned_to.username}.",
+            read=False,
+        )
+    return True
+
+
+def save_task_form(form):
+    task = form.save(commit=False)
+    update_fields = list(form._meta.fields)
+    if 'status' in form.changed_data:
+        task.completed_at = timezone.now() if task.status == 'Completed' else None
+        update_fields.append('completed_at')
+    if 'due_date' in form.changed_data:
+        # New due date, so the sweeper may remind / flag it again
+        task.reminder_sent_at = task.overdue_notified_at = None
+        update_fields += ['reminder_sent_at', 'overdue_notified_at']
+    # Only write the edited columns so concurrent counter updates aren't clobbered
+    task.save(update_fields=update_fields)
+    record_task_activity(task.pk)
+
+    if task.status == 'Completed':
+        send_mail(
+            'Task Completed',
+            f'Task "{task.title}" just completed.',
+            'from@example.com',
+            [task.created_by.email],
+        )
+    return task
+
+
+def visible_tasks(user, profile):
+    # Tasks shown on the task list, depending on role
+    employee_ids = list(team_member_ids(profile.manager_id))
+
+    if profile.role == 'Employee':
+        base_tasks = Task.objects.filter(created_by_id=profile.manager_id, assigned_to__in=employee_ids)
+    elif profile.role == 'Manager':
+        base_tasks = Task.objects.filter(created_by=user)
+    else:
+        base_tasks = Task.objects.filter(assigned_to=user)
+    return base_tasks, employee_ids
+
+
+def bump_data_version(user_ids):
+    Profile.objects.filter(user_id__in=user_ids).update(data_version=F('data_version') + 1)
+    # update() skips the signals, so drop the cached profiles here
+    invalidate_users(user_ids)
+
+
+def apply_search_filters(tasks, form, today):
+    if not form.is_valid():
+        return tasks
+    if form.cleaned_data['title']:
+        tasks = tasks.filter(title__icontains=form.cleaned_data['title'])
+    if form.cleaned_data['priority']:
+        tasks = tasks.filter(priority=form.cleaned_data['priority'])
+    if form.cleaned_data['status']:
+        status = form.cleaned_data['status']
+        if status == 'Overdue':
+            tasks = tasks.filter(status='Pending', due_date__lte=today)
+        else:
+            tasks = tasks.filter(status=status)
+    return tasks
+
+
+def search_team_members(manager_id, query, limit=10):
+    # The indexed part is the profile.manager scope, which keeps the candidate set to
+    # one team; the prefix match is then applied to that team's rows only. Results
+    # are cached briefly since every keystroke in the picker asks again.
+    query = query.strip().lower()
+    # Hashed: raw input may contain spaces or exceed memcached's 250-character key limit
+    digest = hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+    key = f'assignees:{manager_id}:{limit}:{digest}'
+    results = cache.get(key)
+    if results is None:
+        results = list(
+            User.objects.filter(profile__manager_id=manager_id)
+            .filter(Q(username__istartswith=query) | Q(email__istartswith=query))
+            .order_by('username')
+            .values('id', 'username', 'email')[:limit]
+        )
+        cache.set(key, results, getattr(settings, 'ASSIGNEE_SEARCH_CACHE_TIMEOUT', 30))
+    return results
+
+
+def manageable_tasks(user, tasks=None):
+    # Tasks a manager may edit or delete: created by themselves or by one of their employees
+    tasks = Task.objects.all() if tasks is None else tasks
+    return tasks.filter(Q(created_by=user) | Q(created_by__profile__manager=user))
+
+
+def delete_tasks(tasks):
+    # Set-based delete: one DELETE per dependant table, then one for the tasks,
+    # instead of letting the collector load every row into Python.
+    Comment.objects.filter(task__in=tasks).delete()
+    TaskOrder.objects.filter(task__in=tasks).delete()
+    Notification.objects.filter(task__in=tasks).delete()
+    return tasks._raw_delete(tasks.db)
+
+
+BULK_FIELDS = {
+    'reassign': 'assigned_to',
+    'priority': 'priority',
+    'status': 'status',
+    'due_date': 'due_date',
+}
+
+
+@transaction.atomic
+def bulk_task_action(tasks, action, value, actor):
+    tasks = tasks.order_by()
+    affected = dict(tasks.values_list('assigned_to').annotate(n=Count('id')))
+
+    if action == 'delete':
+        count = delete_tasks(tasks)
+        messages = {
+            user_id: f"{n} of your tasks were deleted by {actor.username}."
+            for user_id, n in affected.items()
+        }
+    else:
+        now = timezone.now()
+        values = {BULK_FIELDS[action]: value, 'last_activity_at': now}
+        if action == 'status':
+            values['completed_at'] = now if value == 'Completed' else None
+        elif action == 'due_date':
+            values['reminder_sent_at'] = values['overdue_notified_at'] = None
+        count = tasks.update(**values)
+        if action == 'reassign':
+            messages = {
+                user_id: f"{n} of your tasks were reassigned by {actor.username}."
+                for user_id, n in affected.items() if user_id != value.pk
+            }
+            if count:
+                messages[value.pk] = f"{count} tasks were assigned to you by {actor.username}."
+        else:
+            messages = {
+                user_id: f"{n} of your tasks had their {BULK_FIELDS[action].replace('_', ' ')} changed by {actor.username}."
+                for user_id, n in affected.items()
+            }
+
+    Notification.objects.bulk_create([
+        Notification(user_id=user_id, message=message) for user_id, message in messages.items()
+    ])
+    return count
+
+
+def archive_tasks(task_ids, when=None):
+    # Archived tasks keep their comments for export; per-user orderings and
+    # notifications pointing at them are dropped along with them leaving the hot set.
+    with transaction.atomic():
+        TaskOrder.objects.filter(task_id__in=task_ids).delete()
+        Notification.objects.filter(task_id__in=task_ids).delete()
+        return Task.objects.filter(pk__in=task_ids).update(archived_at=when or timezone.now())
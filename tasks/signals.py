@@ -1,9 +1,44 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.contrib.auth.models import User
 from django.dispatch import receiver
+from .context import invalidate_teams, invalidate_users
 from .models import Profile
 
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
     if created:
-        Profile.objects.create(user=instance)
+        # Callers can set _profile_role / _profile_manager before saving so the
+        # Profile is inserted once with its final values.
+        Profile.objects.create(
+            user=instance,
+            role=getattr(instance, '_profile_role', ''),
+            manager=getattr(instance, '_profile_manager', None),
+        )
+
+# Keep the cached user contexts (tasks.context) in step with the database
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_context(sender, instance, **kwargs):
+    invalidate_users([instance.pk])
+
+@receiver(pre_delete, sender=User)
+def invalidate_team_of_deleted_manager(sender, instance, **kwargs):
+    # Deleting a manager nulls profile.manager with a plain UPDATE, which sends no signals
+    employee_ids = list(Profile.objects.filter(manager=instance).values_list('user_id', flat=True))
+    if employee_ids:
+        invalidate_users(employee_ids)
+        invalidate_teams([instance.pk, None])
+
+@receiver(pre_save, sender=Profile)
+def remember_previous_manager(sender, instance, **kwargs):
+    instance._previous_manager_id = (
+        Profile.objects.filter(pk=instance.pk).values_list('manager_id', flat=True).first()
+        if instance.pk else None
+    )
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_context(sender, instance, **kwargs):
+    invalidate_users([instance.user_id])
+    invalidate_teams({instance.manager_id, getattr(instance, '_previous_manager_id', instance.manager_id)})
@@ -0,0 +1,200 @@
+const batchUrl = document.currentScript.dataset.batchUrl;
+
+const notificationIcon = document.getElementById('notification-icon');
+const notificationDropdown = document.getElementById('notification-dropdown');
+const notificationCount = document.getElementById('notification-count');
+const notificationList = document.getElementById('notification-list');
+
+notificationIcon.addEventListener('click', () => {
+  notificationDropdown.style.display = notificationDropdown.style.display === 'block' ? 'none' : 'block';
+});
+
+// Close dropdown if click outside
+document.addEventListener('click', (event) => {
+  if (!notificationIcon.contains(event.target) && !notificationDropdown.contains(event.target)) {
+    notificationDropdown.style.display = 'none';
+  }
+});
+
+let notificationsEtag = null;
+
+function fetchNotifications() {
+  const headers = {};
+  if (notificationsEtag) {
+    headers['If-None-Match'] = notificationsEtag;
+  }
+  fetch('/notifications/api/', { headers, cache: 'no-store' })
+    .then(res => {
+      if (res.status === 304 || !res.ok) {
+        return null;  // unchanged since last poll (or throttled), keep the current list
+      }
+      notificationsEtag = res.headers.get('ETag');
+      return res.json();
+    })
+    .then(data => {
+      if (!data) {
+        return;
+      }
+      notificationList.innerHTML = '';
+      if (data.notifications.length === 0) {
+        const li = document.createElement('li');
+        li.textContent = 'No notifications';
+        li.style.textAlign = 'center';
+        notificationList.appendChild(li);
+        notificationCount.textContent = '';
+      } else {
+        data.notifications.forEach(n => {
+          const li = document.createElement('li');
+
+          const anchor = document.createElement('a');
+          anchor.href = '#';
+          anchor.textContent = n.message;
+          anchor.style.cursor = 'pointer';
+
+          anchor.onclick = (e) => {
+            e.preventDefault();
+            if (n.task_id) {
+              loadTaskModal(n.task_id);
+            }
+          };
+
+          const btn = document.createElement('button');
+          btn.textContent = 'x';
+          btn.title = 'Dismiss notification';
+          btn.onclick = (e) => {
+            e.preventDefault();
+            e.stopPropagation();
+            dismissNotification(n.id);
+          };
+
+          li.appendChild(anchor);
+          li.appendChild(btn);
+          notificationList.appendChild(li);
+        });
+        notificationCount.textContent = data.unread_count || '';
+      }
+    });
+}
+
+// Queue operations fired in the same tick and send them as one /api/batch/ request
+let pendingOperations = [];
+
+function batchOperation(op) {
+  return new Promise((resolve, reject) => {
+    pendingOperations.push({ op, resolve, reject });
+    if (pendingOperations.length === 1) {
+      setTimeout(flushOperations, 50);
+    }
+  });
+}
+
+function flushOperations() {
+  const queued = pendingOperations;
+  pendingOperations = [];
+  fetch(batchUrl, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'X-CSRFToken': getCookie('csrftoken')
+    },
+    body: JSON.stringify({ operations: queued.map(q => q.op) }),
+  }).then(res => res.json())
+    .then(data => {
+      if (!data.success) {
+        throw new Error(data.error);
+      }
+      data.results.forEach((result, idx) => queued[idx].resolve(result));
+    })
+    .catch(err => queued.forEach(q => q.reject(err)));
+}
+
+function dismissNotification(id) {
+  batchOperation({ op: 'dismiss_notification', notification_id: id })
+    .then(() => fetchNotifications())
+    .catch(console.error);
+}
+
+function loadTaskModal(taskId) {
+  const modalBody = document.getElementById('modalFormBody');
+  const formModal = new bootstrap.Modal(document.getElementById('formModal'));
+
+  modalBody.innerHTML = 'Loading...';
+
+  fetch(`/tasks/${taskId}/`, {
+    headers: { 'X-Requested-With': 'XMLHttpRequest' }
+  })
+    .then(res => res.text())
+    .then(html => {
+      modalBody.innerHTML = html;
+      formModal.show();
+    })
+    .catch(() => {
+      modalBody.innerHTML = '<p>Error loading task.</p>';
+      formModal.show();
+    });
+}
+
+// Assignee autocomplete (tasks.forms.AssigneeAutocomplete). Delegated, since
+// task forms are injected into the modal after page load.
+let assigneeSearchTimer = null;
+
+document.addEventListener('input', (event) => {
+  const input = event.target.closest('[data-assignee-search]');
+  if (!input) {
+    return;
+  }
+  const container = input.closest('.assignee-autocomplete');
+  const hidden = container.querySelector('input[type="hidden"]');
+  const results = container.querySelector('.assignee-results');
+  hidden.value = '';  // typing invalidates the previous pick
+
+  clearTimeout(assigneeSearchTimer);
+  const query = input.value.trim();
+  if (!query) {
+    results.innerHTML = '';
+    return;
+  }
+  assigneeSearchTimer = setTimeout(() => {
+    fetch(`${input.dataset.assigneeSearch}?q=${encodeURIComponent(query)}`, {
+      headers: { 'X-Requested-With': 'XMLHttpRequest' }
+    })
+      .then(res => res.ok ? res.json() : { results: [] })
+      .then(data => {
+        results.innerHTML = '';
+        data.results.forEach(u => {
+          const item = document.createElement('button');
+          item.type = 'button';
+          item.className = 'list-group-item list-group-item-action';
+          item.textContent = `${u.username} (${u.email})`;
+          item.onclick = () => {
+            hidden.value = u.id;
+            input.value = u.username;
+            results.innerHTML = '';
+          };
+          results.appendChild(item);
+        });
+      });
+  }, 250);
+});
+
+// CSRF helper function
+function getCookie(name) {
+  let cookieValue = null;
+  if (document.cookie && document.cookie !== '') {
+    const cookies = document.cookie.split(';');
+    for(let cookie of cookies) {
+      cookie = cookie.trim();
+      if (cookie.startsWith(name + '=')) {
+        cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+        break;
+      }
+    }
+  }
+  return cookieValue;
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+  if (notificationIcon) {
+    fetchNotifications();
+  }
+});
@@ -0,0 +1,140 @@
+const dashboardUrls = document.currentScript.dataset;
+const statusData = JSON.parse(document.getElementById('chart-data-status').textContent);
+const priorityData = JSON.parse(document.getElementById('chart-data-priority').textContent);
+const statusCtx = document.getElementById('statusChart').getContext('2d');
+const priorityCtx = document.getElementById('priorityChart').getContext('2d');
+const loadingMsg = document.getElementById('loadingMessage');
+const exportBtn = document.getElementById('exportBtn');
+
+const statusChart = new Chart(statusCtx, {
+  type: 'pie',
+  data: {
+    labels: ['Pending', 'Completed', 'Overdue'],
+    datasets: [{
+      data: [statusData.Pending, statusData.Completed, statusData.Overdue],
+      backgroundColor: ['#f1c40f', '#2ecc71', '#e74c3c']
+    }]
+  }
+});
+
+const priorityChart = new Chart(priorityCtx, {
+  type: 'doughnut',
+  data: {
+    labels: ['High', 'Medium', 'Low'],
+    datasets: [{
+      data: [priorityData.High, priorityData.Medium, priorityData.Low],
+      backgroundColor: ['#c0392b', '#f39c12', '#3498db']
+    }]
+  }
+});
+
+exportBtn.addEventListener('click', function() {
+	  loadingMsg.style.display = 'inline';
+	  exportBtn.disabled = true;
+	  const selectedEmployeeId = document.getElementById('employee-select').value;
+	  const exportUrl = dashboardUrls.exportUrl + "?employee=" + selectedEmployeeId;
+	  window.location.href = exportUrl;
+
+	  // Reset UI after 5 seconds (adjust time if needed)
+	  setTimeout(() => {
+		loadingMsg.style.display = 'none';
+		exportBtn.disabled = false;
+	  }, 3000);
+	});
+
+
+function openFormModal(url) {
+  const modal = new bootstrap.Modal(document.getElementById('formModal'));
+  const modalBody = document.getElementById('modalFormBody');
+  modalBody.innerHTML = '<p>Loading...</p>';
+
+  fetch(url, {
+    headers: {
+      'X-Requested-With': 'XMLHttpRequest'
+    }
+  })
+  .then(response => response.text())
+  .then(html => {
+    modalBody.innerHTML = html;
+    modal.show();
+
+    const form = modalBody.querySelector('form');
+    if (form) {
+      form.addEventListener('submit', function(e) {
+        e.preventDefault();
+        if (form.dataset.confirm && !confirm(form.dataset.confirm)) {
+          return;
+        }
+        const formData = new FormData(form);
+        fetch(form.action, {
+          method: 'POST',
+          body: formData,
+          headers: {'X-Requested-With': 'XMLHttpRequest'}
+        })
+        .then(res => res.json())
+        .then(data => {
+          if(data.success){
+            modal.hide();
+            location.reload();
+          } else {
+            modalBody.innerHTML = data.html_form; // form with errors
+          }
+        })
+        .catch(console.error);
+      });
+    }
+  });
+}
+
+// Assuming 'modal' is your bootstrap.Modal instance and 'modalBody' is modal content container
+const form = document.getElementById('modalFormBody').querySelector('form');
+const emailWaitDiv = document.getElementById('emailWaitMessage');
+
+if (form) {
+  form.addEventListener('submit', function(e) {
+    e.preventDefault();
+	  const sendEmailCheckbox = form.querySelector('input[name="send_email"]');
+		const willSendEmail = sendEmailCheckbox && sendEmailCheckbox.checked;
+    const modalBody = document.getElementById('modalFormBody');
+		if (willSendEmail) {
+		  emailWaitDiv.style.visibility = 'visible';  // to show
+
+		} else {
+		  emailWaitDiv.style.visibility = 'hidden';   // to hide
+
+		}
+    const formData = new FormData(form);
+    fetch(form.action, {
+      method: 'POST',
+      body: formData,
+      headers: {'X-Requested-With': 'XMLHttpRequest'}
+    })
+    .then(response => response.json())
+    .then(data => {
+      if (data.success) {
+		emailWaitDiv.style.visibility = 'hidden';   // to hide
+
+      // close modal
+        // Close delete modal
+        const modalElement = document.getElementById('formModal');
+        const modal = bootstrap.Modal.getInstance(modalElement);
+        modal.hide();
+
+        // Reopen user_list modal after user deleted
+        openFormModal(dashboardUrls.userListUrl);
+      } else {
+        emailWaitDiv.style.visibility = 'hidden';   // to hide
+
+      // show form errors
+      const modalBody = document.getElementById('modalFormBody');
+      
+		  // Render form with errors in modalBody (if sent as HTML)
+        modalBody.innerHTML = data.html_form || '<p>An error occurred</p>';
+      }
+    })
+    .catch(error => {
+      console.error('Error:', error);
+      alert('An error occurred while deleting user.');
+    });
+  });
+}
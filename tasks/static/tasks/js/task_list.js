@@ -0,0 +1,22 @@
+document.addEventListener('DOMContentLoaded', function () {
+  const container = document.getElementById('tasksContainer');
+
+  const sortable = new Sortable(container, {
+    animation: 150,
+    onMove(evt) {
+      return true; // allow moving all elements
+    },
+    onEnd: function () {
+      const order = [];
+      container.querySelectorAll('.task-block').forEach(function (el, idx) {
+        order.push({id: el.getAttribute('data-id'), order: idx});
+      });
+
+      batchOperation({op: 'reorder', order})
+      .then(result => {
+        if (!result.success) alert('Error saving task order');
+      })
+      .catch(() => alert('Failed to save task order'));
+    }
+  });
+});
@@ -1,3 +1,323 @@
-from django.test import TestCase
+import datetime
+import json
+import warnings
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .batch import OPERATIONS, BatchError
+from .deletion import DeletionError, queue_user_deletion, run_deletion_job
+from .models import Comment, Notification, Task, TaskOrder, UserDeletionJob
+from .services import record_comment
+
+
+class BatchApiTests(TestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', 'manager@example.com', 'pass1234')
+        self.manager.profile.role = 'Manager'
+        self.manager.profile.save()
+        self.employee = User.objects.create_user('employee', 'employee@example.com', 'pass1234')
+        self.employee.profile.role = 'Employee'
+        self.employee.profile.manager = self.manager
+        self.employee.profile.save()
+        self.task = Task.objects.create(
+            title='Write report', description='Quarterly', due_date=datetime.date(2030, 1, 1),
+            created_by=self.manager, assigned_to=self.employee,
+        )
+        self.client.force_login(self.employee)
+
+    def post_batch(self, operations):
+        return self.client.post(
+            reverse('batch_api'), json.dumps({'operations': operations}), content_type='application/json',
+        )
+
+    def test_non_string_op_name_fails_only_that_operation(self):
+        notification = Notification.objects.create(user=self.employee, message='Hello')
+        response = self.post_batch([
+            {'op': []},
+            {'op': 'dismiss_notification', 'notification_id': notification.id},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(results[0], {'op': None, 'success': False, 'error': 'Unknown operation.'})
+        self.assertTrue(results[1]['success'])
+        self.assertFalse(Notification.objects.filter(pk=notification.pk).exists())
+
+    def test_invalid_notification_id_fails_only_that_operation(self):
+        response = self.post_batch([
+            {'op': 'dismiss_notification', 'notification_id': 'abc'},
+            {'op': 'mark_done', 'task_id': self.task.id},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertFalse(results[0]['success'])
+        self.assertEqual(results[0]['error'], 'Notification not found.')
+        self.assertTrue(results[1]['success'])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'Completed')
+
+    def test_failed_operation_is_rolled_back_to_its_savepoint(self):
+        def rename_then_fail(ctx, op):
+            Task.objects.filter(pk=op['task_id']).update(title='Renamed')
+            raise BatchError('Failed after writing.')
+
+        with patch.dict(OPERATIONS, {'rename_then_fail': rename_then_fail}):
+            response = self.post_batch([
+                {'op': 'add_comment', 'task_id': self.task.id, 'content': 'Looks good'},
+                {'op': 'rename_then_fail', 'task_id': self.task.id},
+            ])
+        results = response.json()['results']
+        self.assertTrue(results[0]['success'])
+        self.assertEqual(results[1]['error'], 'Failed after writing.')
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'Write report')
+        self.assertEqual(self.task.comments.count(), 1)
+        self.assertEqual(self.task.comment_count, 1)
+
+
+    def test_out_of_range_order_fails_only_that_operation(self):
+        response = self.post_batch([
+            {'op': 'reorder', 'order': [{'id': self.task.id, 'order': -1}]},
+            {'op': 'reorder', 'order': [{'id': self.task.id, 'order': 2 ** 31}]},
+            {'op': 'mark_done', 'task_id': self.task.id},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(results[0]['error'], 'Invalid order payload.')
+        self.assertEqual(results[1]['error'], 'Invalid order payload.')
+        self.assertTrue(results[2]['success'])
+        self.assertFalse(TaskOrder.objects.filter(user=self.employee).exists())
+
+    def test_database_error_fails_only_that_operation(self):
+        def violate_constraint(ctx, op):
+            raise IntegrityError('constraint failed')
+
+        with patch.dict(OPERATIONS, {'violate_constraint': violate_constraint}):
+            response = self.post_batch([
+                {'op': 'violate_constraint'},
+                {'op': 'mark_done', 'task_id': self.task.id},
+            ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertFalse(results[0]['success'])
+        self.assertTrue(results[1]['success'])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'Completed')
+
+
+class BulkTaskActionTests(TestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', 'manager@example.com', 'pass1234')
+        self.manager.profile.role = 'Manager'
+        self.manager.profile.save()
+        for title, priority in [('Low one', 'Low'), ('High one', 'High'), ('Another low', 'Low')]:
+            Task.objects.create(
+                title=title, description='', priority=priority, due_date=datetime.date(2030, 1, 1),
+                created_by=self.manager, assigned_to=self.manager,
+            )
+        self.client.force_login(self.manager)
+
+    def post_bulk(self, query, data):
+        return self.client.post(
+            reverse('task_bulk_action') + query, data, HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+
+    def test_apply_to_filter_acts_on_matching_tasks_only(self):
+        response = self.post_bulk('?priority=Low', {'action': 'delete', 'apply_to_filter': 'on'})
+        self.assertEqual(response.json(), {'success': True, 'count': 2})
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['High one'])
+
+    def test_apply_to_filter_with_invalid_filter_does_nothing(self):
+        response = self.post_bulk('?priority=Urgent', {'action': 'delete', 'apply_to_filter': 'on'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('priority', response.json()['errors'])
+        self.assertEqual(Task.objects.count(), 3)
+
+
+class PageRenderingTests(TestCase):
+    def test_dashboard_renders_without_collected_static_files(self):
+        user = User.objects.create_user('manager', 'manager@example.com', 'pass1234')
+        self.client.force_login(user)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'tasks/js/dashboard.js')
+
+
+@override_settings(METRICS_MULTIPROCESS_DIR='/nonexistent/taskflow-metrics', METRICS_TOKEN=None)
+class MetricsDirectoryTests(TestCase):
+    def test_missing_directory_does_not_break_requests_or_scrapes(self):
+        with self.assertLogs('tasks.metrics', 'ERROR'):
+            self.assertEqual(self.client.get(reverse('login')).status_code, 200)
+            response = self.client.get(reverse('metrics'), REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('taskflow_http_requests_total{', response.content.decode())
+
+
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('employee', 'employee@example.com', 'pass1234')
+        self.client.force_login(self.user, backend='tasks.auth.CachedModelBackend')
+        self.assertEqual(self.client.get(reverse('dashboard')).status_code, 200)
+
+    def test_per_process_cache_is_not_trusted_for_the_session_user(self):
+        # A queryset update sends no signals, like a deactivation made by another worker
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+
+class AssigneeSearchTests(TestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', 'manager@example.com', 'pass1234')
+        self.manager.profile.role = 'Manager'
+        self.manager.profile.save()
+        for username in ['john', 'johnny', 'mary']:
+            employee = User.objects.create_user(username, f'{username}@example.com', 'pass1234')
+            employee.profile.manager = self.manager
+            employee.profile.save()
+        self.client.force_login(self.manager)
+
+    def search(self, query):
+        return self.client.get(reverse('assignee_search'), {'q': query}).json()['results']
+
+    def test_prefix_search_is_scoped_to_the_team(self):
+        User.objects.create_user('johnson', 'johnson@example.com', 'pass1234')
+        self.assertEqual([r['username'] for r in self.search('JOH')], ['john', 'johnny'])
+
+    def test_any_query_makes_a_valid_cache_key(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            self.assertEqual(self.search('john smith'), [])
+            self.assertEqual(self.search('j' * 300), [])
+
+
+@override_settings(USER_DELETION_RUN_IN_THREAD=False)
+class UserDeletionTests(TestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('manager', 'manager@example.com', 'pass1234')
+        self.manager.profile.role = 'Manager'
+        self.manager.profile.save()
+        self.leaver = self.make_employee('leaver')
+        self.stayer = self.make_employee('stayer')
+
+        self.assigned = self.make_task('Assigned to leaver', self.manager, self.leaver)
+        self.created = self.make_task('Created by leaver', self.leaver, self.stayer)
+        self.untouched = self.make_task('Untouched', self.manager, self.stayer)
+
+        self.base = timezone.now() - datetime.timedelta(days=1)
+        self.kept_comment = self.comment(self.assigned, self.stayer, 1)
+        self.comment(self.assigned, self.leaver, 2)
+        self.comment(self.untouched, self.leaver, 3)
+        Notification.objects.create(user=self.leaver, message='Hello')
+        TaskOrder.objects.create(user=self.leaver, task=self.untouched, position=1)
+
+    def make_employee(self, username):
+        user = User.objects.create_user(username, f'{username}@example.com', 'pass1234')
+        user.profile.manager = self.manager
+        user.profile.save()
+        return user
+
+    def make_task(self, title, created_by, assigned_to):
+        return Task.objects.create(
+            title=title, description='', due_date=datetime.date(2030, 1, 1),
+            created_by=created_by, assigned_to=assigned_to,
+        )
+
+    def comment(self, task, author, hours):
+        when = self.base + datetime.timedelta(hours=hours)
+        comment = Comment.objects.create(task=task, author=author, content='Note')
+        Comment.objects.filter(pk=comment.pk).update(created_at=when)
+        record_comment(task.pk, when)
+        return Comment.objects.get(pk=comment.pk)
+
+    def run_job(self, users, **kwargs):
+        job = queue_user_deletion(users, self.manager, **kwargs)
+        self.assertTrue(run_deletion_job(job.pk))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('Done', ''))
+        return job
+
+    def assertCountersConsistent(self):
+        for task in Task.all_objects.all():
+            comments = list(task.comments.order_by('created_at'))
+            self.assertEqual(task.comment_count, len(comments), task.title)
+            self.assertEqual(task.last_comment_at, comments[-1].created_at if comments else None, task.title)
+
+    def assertLeaverGone(self):
+        self.assertFalse(User.objects.filter(pk=self.leaver.pk).exists())
+        self.assertFalse(Comment.objects.filter(author_id=self.leaver.pk).exists())
+        self.assertFalse(Notification.objects.filter(user_id=self.leaver.pk).exists())
+        self.assertFalse(TaskOrder.objects.filter(user_id=self.leaver.pk).exists())
+
+    def test_delete_removes_their_tasks(self):
+        job = self.run_job([self.leaver])
+        self.assertLeaverGone()
+        self.assertEqual(list(Task.all_objects.values_list('pk', flat=True)), [self.untouched.pk])
+        self.assertEqual((job.deleted_users, job.total_users), (1, 1))
+        self.assertGreater(job.deleted_rows, 0)
+        self.assertCountersConsistent()
+
+    def test_reassign_hands_tasks_to_the_target(self):
+        self.run_job([self.leaver], task_action='reassign', reassign_to=self.stayer)
+        self.assertLeaverGone()
+        self.assigned.refresh_from_db()
+        self.created.refresh_from_db()
+        self.assertEqual(self.assigned.assigned_to, self.stayer)
+        self.assertEqual(self.created.created_by, self.stayer)
+        self.assertIsNone(self.assigned.archived_at)
+        self.assertEqual(self.assigned.last_comment_at, self.kept_comment.created_at)
+        self.assertTrue(Notification.objects.filter(user=self.stayer, message__contains='handed over').exists())
+        self.assertCountersConsistent()
+
+    def test_archive_archives_and_hands_over_tasks(self):
+        self.run_job([self.leaver], task_action='archive', reassign_to=self.stayer)
+        self.assertLeaverGone()
+        archived = Task.all_objects.archived()
+        self.assertEqual(set(archived.values_list('pk', flat=True)), {self.assigned.pk, self.created.pk})
+        self.assertFalse(archived.exclude(assigned_to=self.stayer).exclude(created_by=self.stayer).exists())
+        self.assertCountersConsistent()
+
+    def test_deleting_a_manager_detaches_their_employees(self):
+        self.run_job([self.manager], task_action='reassign', reassign_to=self.stayer)
+        self.stayer.profile.refresh_from_db()
+        self.assertIsNone(self.stayer.profile.manager)
+        self.assertEqual(
+            set(Task.all_objects.filter(created_by=self.stayer).values_list('pk', flat=True)),
+            {self.assigned.pk, self.untouched.pk},
+        )
+
+    def test_goodbye_email_is_sent_without_storing_personal_data(self):
+        job = self.run_job([self.leaver], reason='Left the company', send_email=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['leaver@example.com'])
+        self.assertIn('Left the company', mail.outbox[0].body)
+        self.assertEqual(job.user_ids, [self.leaver.pk])
+
+    def test_rerunning_a_job_is_safe(self):
+        job = self.run_job([self.leaver], task_action='reassign', reassign_to=self.stayer)
+        self.assertFalse(run_deletion_job(job.pk))
+
+        # A worker that died mid-run leaves the job Running; once stale it is claimed again
+        stale = timezone.now() - datetime.timedelta(days=1)
+        UserDeletionJob.objects.filter(pk=job.pk).update(status='Running', started_at=stale)
+        self.assertTrue(run_deletion_job(job.pk))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.deleted_users), ('Done', 1))
+        self.assertLeaverGone()
+        self.assertEqual(Task.all_objects.count(), 3)
+        self.assertCountersConsistent()
+
+    def test_job_fails_when_the_hand_over_target_is_gone(self):
+        job = queue_user_deletion([self.leaver], self.manager, task_action='reassign', reassign_to=self.stayer)
+        self.stayer.delete()
+        self.manager.delete()
+        with self.assertRaises(DeletionError):
+            run_deletion_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'Failed')
+        self.assertTrue(User.objects.filter(pk=self.leaver.pk).exists())
@@ -11,9 +11,15 @@ urlpatterns = [
     path('tasks/create/', views.task_create, name='task_create'),
     path('tasks/<int:pk>/edit/', views.task_update, name='task_update'),
     path('tasks/<int:pk>/delete/', views.task_delete, name='task_delete'),
+    path('tasks/bulk/', views.task_bulk_action, name='task_bulk_action'),
+    path('tasks/archive/export/', views.archive_export, name='archive_export'),
     path('password_reset/', views.password_reset_view, name='password_reset'),
     path('users/', views.user_list_view, name='user_list'),
     path('users/<int:user_id>/delete/', views.delete_user_view, name='delete_user'),
+    path('users/import/', views.provision_employees_view, name='provision_employees'),
+    path('users/search/', views.assignee_search, name='assignee_search'),
+    path('users/delete/', views.bulk_delete_users_view, name='bulk_delete_users'),
+    path('users/deletions/<int:job_id>/', views.user_deletion_status, name='user_deletion_status'),
     path('users/', views.user_list_view, name='user_list'),
     path('users/<int:user_id>/delete/', views.delete_user_view, name='delete_user'),
     path('tasks/<int:task_id>/mark-done/', views.mark_task_done, name='mark_task_done'),
@@ -27,4 +33,6 @@ urlpatterns = [
     path('reset/<uidb64>/<token>/', auth_views.PasswordResetConfirmView.as_view(), name='password_reset_confirm'),
     path('reset/done/', auth_views.PasswordResetCompleteView.as_view(), name='password_reset_complete'),
     path('tasks/update-order/', views.update_task_order, name='update_task_order'),
+    path('api/batch/', views.batch_api, name='batch_api'),
+    path('metrics', views.metrics_view, name='metrics'),
 ]
@@ -1,11 +1,12 @@
 # Django core
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponse, FileResponse, HttpResponseForbidden
+from django.http import JsonResponse, HttpResponse, FileResponse, HttpResponseForbidden, StreamingHttpResponse
 from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST, require_http_methods
-from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
+from django.views.decorators.cache import never_cache, cache_control
+from django.views.decorators.http import condition
 
 # Django auth
 from django.contrib import messages
@@ -14,20 +15,36 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.forms import AuthenticationForm, PasswordResetForm
 from django.contrib.auth.models import User
-from django.db.models import Prefetch
+from django.core.paginator import Paginator
+from django.db.models import Prefetch, Q
 
 # Models & forms
-from .models import Task, Profile, Comment, Notification, TaskOrder
+from .models import Task, Comment, Notification, TaskOrder, UserDeletionJob
 from .forms import (
-    SignUpForm, TaskForm, SearchForm, CommentForm, UserDeleteForm
+    SignUpForm, TaskForm, SearchForm, CommentForm, UserDeleteForm, BulkTaskForm, EmployeeImportForm,
+    BulkUserDeleteForm,
+)
+from .deletion import queue_user_deletion
+from .provisioning import provision_employees, read_employee_csv
+from .ratelimit import rate_limit
+from . import metrics
+from .services import (
+    add_comment_to_task, complete_task, save_task_form, visible_tasks, bump_data_version,
+    apply_search_filters, manageable_tasks, bulk_task_action, search_team_members,
+)
+from .batch import run_batch, MAX_BATCH_OPERATIONS
+from .conditional import (
+    notifications_etag, notifications_last_modified,
+    task_list_etag, task_list_last_modified,
+    dashboard_etag, dashboard_last_modified,
 )
 
-# Email
-from django.core.mail import send_mail
+# Settings
 from django.conf import settings
 
 # Data processing / utils
 from datetime import date
+import csv
 import json
 
 # Matplotlib (for charts)
@@ -69,7 +86,7 @@ def login_view(request):
             login_form = AuthenticationForm()  # unbound to avoid errors on login form
             if signup_form.is_valid():
                 user = signup_form.save()
-                login(request, user)
+                login(request, user, backend='tasks.auth.CachedModelBackend')
                 return redirect('dashboard')
     else:
         login_form = AuthenticationForm()
@@ -101,68 +118,172 @@ def password_reset_view(request):
 
 @never_cache
 @login_required
-def user_list_view(request):
-    profile = request.user.profile
+def user_list_view(request, error=None):
+    profile = request.user_context.profile
     if profile.role == 'Manager':
         users = User.objects.filter(profile__manager=request.user).exclude(profile__role='Manager')
     elif request.user.is_superuser:
         users = User.objects.all()
     else:
         users = User.objects.none()
-    return render(request, 'tasks/user_list.html', {'users': users})
+    users = users.select_related('profile').order_by('username')
+    page_obj = Paginator(users, getattr(settings, 'USER_LIST_PAGE_SIZE', 25)).get_page(request.GET.get('page'))
+    return render(request, 'tasks/user_list.html', {
+        'users': page_obj,
+        'page_obj': page_obj,
+        'bulk_delete_form': BulkUserDeleteForm(),
+        'error': error,
+    })
+
+@login_required
+@require_GET
+def assignee_search(request):
+    # Backs the assignee autocomplete in TaskForm / BulkTaskForm
+    if not request.user_context.is_manager:
+        return JsonResponse({'results': []}, status=403)
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'results': []})
+    limit = getattr(settings, 'ASSIGNEE_SEARCH_LIMIT', 10)
+    return JsonResponse({'results': search_team_members(request.user.pk, query, limit)})
+
+@login_required
+@never_cache
+@require_http_methods(["GET", "POST"])
+@rate_limit(cost=20, burst=2, per=60, heavy=True, methods=('POST',))
+def provision_employees_view(request):
+    profile = request.user_context.profile
+    if profile.role != 'Manager':
+        messages.error(request, "You don't have permission to add users.")
+        return redirect('dashboard')
+
+    errors = []
+    if request.method == 'POST':
+        form = EmployeeImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                rows = read_employee_csv(form.cleaned_data['csv_file'].read())
+            except (UnicodeDecodeError, ValueError):
+                rows, errors = [], ["Could not read the CSV file."]
+            if rows:
+                users, errors = provision_employees(rows, request.user)
+                if not errors:
+                    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+                        return JsonResponse({'success': True, 'created': len(users)})
+                    messages.success(request, f"{len(users)} employees created.")
+                    return redirect('user_list')
+            elif not errors:
+                errors = ["The CSV file has no rows."]
+    else:
+        form = EmployeeImportForm()
+
+    context = {'form': form, 'errors': errors}
+    if request.method == 'POST' and request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        html_form = render_to_string('tasks/provision_employees.html', context, request=request)
+        return JsonResponse({'success': False, 'html_form': html_form})
+    return render(request, 'tasks/provision_employees.html', context)
 
 @staff_member_required
 @never_cache
 @require_http_methods(["GET", "POST"])
 def delete_user_view(request, user_id):
-    profile = Profile.objects.get(user=request.user)
+    profile = request.user_context.profile
     if profile.role != 'Manager':
         messages.error(request, "You don't have permission to delete users.")
         return redirect('dashboard')
 
     user_to_delete = get_object_or_404(User, pk=user_id)
+    if user_to_delete == request.user:
+        messages.error(request, "You can't delete your own account.")
+        return redirect('user_list')
+    candidates = _reassign_candidates(request.user).exclude(pk=user_to_delete.pk)
 
     if request.method == 'POST':
-        form = UserDeleteForm(request.POST)
+        form = UserDeleteForm(request.POST, reassign_candidates=candidates)
         if form.is_valid():
-            reason = form.cleaned_data.get('reason', '').strip()
-            send_email = form.cleaned_data.get('send_email', False)
-
-            if send_email:
-                subject = "Your account has been deleted"
-                message = f"Dear {user_to_delete.username},\n\nYour account has been deleted by a Manager."
-                if reason:
-                    message += f"\n\nReason provided:\n{reason}"
-                message += "\n\nIf you have any questions, contact your administrator."
-                send_mail(subject, message, 'admin@taskflow.local', [user_to_delete.email], fail_silently=True)
-
-            user_to_delete.delete()
+            # Tasks, dependants and the goodbye email are handled by the deletion job
+            options = form.deletion_options()
+            job = queue_user_deletion([user_to_delete], request.user, **options)
 
             if request.headers.get('x-requested-with') == 'XMLHttpRequest':
                 # AJAX request: return JSON success response
-                return JsonResponse({'success': True})
+                return JsonResponse({'success': True, 'job_id': job.pk, 'status_url': reverse('user_deletion_status', args=[job.pk])})
             else:
                 # Normal POST: redirect with message
-                messages.success(request, f"User '{user_to_delete.username}' deleted and notified by email." if send_email else f"User '{user_to_delete.username}' deleted.")
+                messages.success(request, f"User '{user_to_delete.username}' is being deleted and will be notified by email." if options['send_email'] else f"User '{user_to_delete.username}' is being deleted.")
                 return redirect('user_list')
     else:
-        form = UserDeleteForm()
+        form = UserDeleteForm(reassign_candidates=candidates)
 
     return render(request, 'tasks/delete_user.html', {'form': form, 'user_to_delete': user_to_delete})
 
+@staff_member_required
+@require_POST
+def bulk_delete_users_view(request):
+    profile = request.user_context.profile
+    if profile.role != 'Manager':
+        messages.error(request, "You don't have permission to delete users.")
+        return redirect('dashboard')
+
+    form = BulkUserDeleteForm(request.POST, reassign_candidates=_reassign_candidates(request.user))
+    is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    if not form.is_valid():
+        error = ' '.join(e for errors in form.errors.values() for e in errors)
+        if is_ajax:
+            html_form = user_list_view(request, error=error).content.decode()
+            return JsonResponse({'success': False, 'html_form': html_form})
+        messages.error(request, error)
+        return redirect('user_list')
+
+    # Same scope as user_list_view
+    users = User.objects.filter(pk__in=form.cleaned_data['user_ids']).exclude(pk=request.user.pk)
+    if not request.user.is_superuser:
+        users = users.filter(profile__manager=request.user)
+    users = list(users)
+    if not users:
+        if is_ajax:
+            html_form = user_list_view(request, error="No users to delete.").content.decode()
+            return JsonResponse({'success': False, 'html_form': html_form})
+        messages.error(request, "No users to delete.")
+        return redirect('user_list')
+
+    job = queue_user_deletion(users, request.user, **form.deletion_options())
+    if is_ajax:
+        return JsonResponse({'success': True, 'job_id': job.pk, 'status_url': reverse('user_deletion_status', args=[job.pk])})
+    messages.success(request, f"{len(users)} users are being deleted.")
+    return redirect('user_list')
+
+@login_required
+@never_cache
+def user_deletion_status(request, job_id):
+    job = get_object_or_404(UserDeletionJob, pk=job_id)
+    if job.requested_by_id != request.user.pk and not request.user.is_superuser:
+        return HttpResponseForbidden("You do not have permission to view this job.")
+    return JsonResponse({
+        'status': job.status,
+        'total_users': job.total_users,
+        'deleted_users': job.deleted_users,
+        'deleted_rows': job.deleted_rows,
+        'error': job.error,
+    })
+
+def _reassign_candidates(manager):
+    # Deleted users' tasks can go to the manager or anyone on their team
+    return User.objects.filter(Q(pk=manager.pk) | Q(profile__manager=manager))
+
 def get_employee_and_chart_data(user, selected_user_id=None):
-    profile = Profile.objects.select_related('manager').get(user=user)
+    profile = user.profile
 
     # Determine manager for filtering employees
     if profile.role == 'Employee':
-        manager_user = profile.manager
+        manager_id = profile.manager_id
     else:  # user is Manager
-        manager_user = user
+        manager_id = user.pk
 
     # Filter only employees under the manager_user (exclude managers)
     # Assuming Profile.role stores "Employee" or "Manager"
     employee_qs = User.objects.filter(
-        profile__manager=manager_user,
+        profile__manager_id=manager_id,
         profile__role='Employee'  # Only employees, exclude managers
     )
 
@@ -192,6 +313,8 @@ def get_employee_and_chart_data(user, selected_user_id=None):
     return employee_qs, selected_user, chart_data_status, chart_data_priority
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=dashboard_etag, last_modified_func=dashboard_last_modified)
 def dashboard(request):
     selected_user_id = request.GET.get('employee')
     employee_qs, selected_user, chart_data_status, chart_data_priority = get_employee_and_chart_data(request.user, selected_user_id)
@@ -204,6 +327,7 @@ def dashboard(request):
     })
 
 @login_required
+@rate_limit(cost=20, burst=3, per=60, heavy=True)
 def export_dashboard_pdf(request):
     selected_user_id = request.GET.get('employee')
     employee_qs, selected_user, status_counts, priority_counts = get_employee_and_chart_data(request.user, selected_user_id)
@@ -227,15 +351,16 @@ def export_dashboard_pdf(request):
             data_dict = {'No data': 1}
             colors_list = ['#cccccc']  # gray color for no data
 
-        plt.figure(figsize=(3, 3))
-        labels = list(data_dict.keys())
-        sizes = list(data_dict.values())
-        plt.pie(sizes, labels=labels, autopct='%1.0f%%', colors=colors_list, startangle=140, textprops={'fontsize': 9})
-        plt.title(title, fontsize=12)
-        plt.tight_layout()
-        buf = io.BytesIO()
-        plt.savefig(buf, format='PNG')
-        plt.close()
+        with metrics.timer('taskflow_chart_render_seconds'):
+            plt.figure(figsize=(3, 3))
+            labels = list(data_dict.keys())
+            sizes = list(data_dict.values())
+            plt.pie(sizes, labels=labels, autopct='%1.0f%%', colors=colors_list, startangle=140, textprops={'fontsize': 9})
+            plt.title(title, fontsize=12)
+            plt.tight_layout()
+            buf = io.BytesIO()
+            plt.savefig(buf, format='PNG')
+            plt.close()
         buf.seek(0)
         return base64.b64encode(buf.read()).decode()
 
@@ -253,7 +378,8 @@ def export_dashboard_pdf(request):
         'no_tasks': len(tasks) == 0,
     })
 
-    pdf_file = weasyprint.HTML(string=html_string).write_pdf()
+    with metrics.timer('taskflow_pdf_render_seconds'):
+        pdf_file = weasyprint.HTML(string=html_string).write_pdf()
 
     response = HttpResponse(pdf_file, content_type='application/pdf')
     filename = f'dashboard_report_{selected_user.username if selected_user else "unknown"}.pdf'
@@ -261,19 +387,14 @@ def export_dashboard_pdf(request):
     return response
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=task_list_etag, last_modified_func=task_list_last_modified)
 def task_list(request):
-    profile = Profile.objects.select_related('manager').get(user=request.user)
+    profile = request.user_context.profile
     today = timezone.localdate()
 
-    employee_ids = list(Profile.objects.filter(manager=profile.manager).values_list('user_id', flat=True))
-
     # Base queryset depending on role
-    if profile.role == 'Employee':
-        base_tasks = Task.objects.filter(created_by=profile.manager, assigned_to__in=employee_ids)
-    elif profile.role == 'Manager':
-        base_tasks = Task.objects.filter(created_by=request.user)
-    else:
-        base_tasks = Task.objects.filter(assigned_to=request.user)
+    base_tasks, employee_ids = visible_tasks(request.user, profile)
 
     # Prefetch comments for efficiency
     base_tasks = base_tasks.prefetch_related(
@@ -282,17 +403,12 @@ def task_list(request):
 
     # Filter tasks using SearchForm before sorting, more efficient
     form = SearchForm(request.GET)
-    if form.is_valid():
-        if form.cleaned_data['title']:
-            base_tasks = base_tasks.filter(title__icontains=form.cleaned_data['title'])
-        if form.cleaned_data['priority']:
-            base_tasks = base_tasks.filter(priority=form.cleaned_data['priority'])
-        if form.cleaned_data['status']:
-            status = form.cleaned_data['status']
-            if status == 'Overdue':
-                base_tasks = base_tasks.filter(status='Pending', due_date__lte=today)
-            else:
-                base_tasks = base_tasks.filter(status=status)
+    base_tasks = apply_search_filters(base_tasks, form, today)
+
+    sort_by_activity = form.is_valid() and form.cleaned_data['sort'] == 'activity'
+    if sort_by_activity:
+        # Served by the (created_by|assigned_to, -last_activity_at) indexes
+        base_tasks = base_tasks.order_by('-last_activity_at')
 
     tasks_list = list(base_tasks)
 
@@ -300,15 +416,20 @@ def task_list(request):
     for task in tasks_list:
         task.is_overdue = (task.status == 'Pending' and task.due_date and task.due_date <= today)
 
-    # Get user-specific saved order from TaskOrder
-    user_orders = TaskOrder.objects.filter(user=request.user).order_by('position')
-    order_map = {to.task_id: to.position for to in user_orders}
+    if not sort_by_activity:
+        # Get user-specific saved order from TaskOrder
+        user_orders = TaskOrder.objects.filter(user=request.user).order_by('position')
+        order_map = {to.task_id: to.position for to in user_orders}
 
-    # Sort tasks by saved order; tasks not in order_map go to end (order 9999)
-    tasks_list.sort(key=lambda t: order_map.get(t.id, 9999))
+        # Sort tasks by saved order; tasks not in order_map go to end (order 9999)
+        tasks_list.sort(key=lambda t: order_map.get(t.id, 9999))
 
     form_comment = CommentForm()
 
+    bulk_form = None
+    if profile.role == 'Manager':
+        bulk_form = BulkTaskForm(employees=User.objects.filter(profile__manager=request.user))
+
     return render(request, 'tasks/task_list.html', {
         'tasks': tasks_list,
         'form': form,
@@ -316,6 +437,7 @@ def task_list(request):
         'today': today,
         'employee_ids': employee_ids,
         'form_comment': form_comment,
+        'bulk_form': bulk_form,
     })
 
 @login_required
@@ -325,23 +447,7 @@ def mark_task_done(request, task_id):
     if task.assigned_to != request.user:
         return HttpResponseForbidden("You do not have permission to modify this task.")
 
-    if task.status != 'Completed':
-        task.status = 'Completed'
-        task.save()
-
-        try:
-            employee_profile = Profile.objects.get(user=task.assigned_to)
-            manager = employee_profile.manager
-        except Profile.DoesNotExist:
-            manager = None
-
-        if manager:
-            Notification.objects.create(
-                user=manager,
-                message=f"Task '{task.title}' was completed by {task.assigned_to.username}.",
-                read=False,
-            )
-
+    complete_task(task)
     return redirect('task_list')
 
 @login_required
@@ -349,13 +455,12 @@ def task_detail(request, pk):
     # Get the task or 404
     task = get_object_or_404(Task, pk=pk)
     # Get profile of current user
-    profile = Profile.objects.get(user=request.user)
+    profile = request.user_context.profile
 
     # Permission checks:
     if profile.role == 'Manager':
         # Manager can see tasks created by self or employees
-        allowed_user_ids = [request.user.id] + list(request.user.employees.values_list('id', flat=True))
-        if task.created_by_id not in allowed_user_ids:
+        if not request.user_context.can_manage(task):
             return redirect('task_list')
     else:
         # Non-managers can see tasks only if assigned to them
@@ -367,10 +472,7 @@ def task_detail(request, pk):
 
     # Handle POST comment submission
     if request.method == 'POST' and form.is_valid():
-        comment = form.save(commit=False)
-        comment.author = request.user
-        comment.task = task
-        comment.save()
+        add_comment_to_task(task, request.user, form)
         return redirect('task_detail', pk=pk)
 
     context = {
@@ -389,7 +491,7 @@ def task_detail(request, pk):
 
 @login_required
 def task_create(request):
-    profile = Profile.objects.get(user=request.user)
+    profile = request.user_context.profile
     if profile.role != 'Manager':
         # Only managers can create tasks
         return redirect('task_list')
@@ -431,28 +533,19 @@ def task_create(request):
 @login_required
 def task_update(request, pk):
     task = get_object_or_404(Task, pk=pk)
-    profile = Profile.objects.get(user=request.user)
+    profile = request.user_context.profile
 
     if profile.role == 'Employee':
         if task.assigned_to != request.user:
             return redirect('task_list')
     elif profile.role == 'Manager':
-        allowed_user_ids = [request.user.id] + list(request.user.employees.values_list('id', flat=True))
-        if task.created_by_id not in allowed_user_ids:
+        if not request.user_context.can_manage(task):
             return redirect('task_list')
 
     if request.method == 'POST':
         form = TaskForm(request.POST, instance=task)
         if form.is_valid():
-            task = form.save()
-            
-            if task.status == 'Completed':
-                send_mail(
-                    'Task Completed',
-                    f'Task "{task.title}" just completed.',
-                    'from@example.com',
-                    [task.created_by.email],
-                )
+            save_task_form(form)
             return redirect('task_list')
     else:
         form = TaskForm(instance=task)
@@ -461,15 +554,14 @@ def task_update(request, pk):
 @login_required
 def task_delete(request, pk):
     task = get_object_or_404(Task, pk=pk)
-    profile = Profile.objects.get(user=request.user)
+    profile = request.user_context.profile
 
     if profile.role != 'Manager':
         messages.error(request, "You don't have permission to delete tasks.")
         return redirect('task_list')
 
     # managers can only delete their own or their employees' tasks
-    allowed_user_ids = [request.user.id] + list(request.user.employees.values_list('id', flat=True))
-    if task.created_by_id not in allowed_user_ids:
+    if not request.user_context.can_manage(task):
         messages.error(request, "You don't have permission to delete this task.")
         return redirect('task_list')
 
@@ -480,6 +572,80 @@ def task_delete(request, pk):
     return render(request, 'tasks/task_confirm_delete.html', {'task': task})
 
 @login_required
+@require_POST
+@rate_limit(cost=5)
+def task_bulk_action(request):
+    profile = request.user_context.profile
+    if profile.role != 'Manager':
+        messages.error(request, "You don't have permission to edit tasks in bulk.")
+        return redirect('task_list')
+
+    form = BulkTaskForm(request.POST, employees=User.objects.filter(profile__manager=request.user))
+    is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    if not form.is_valid():
+        if is_ajax:
+            return JsonResponse({'success': False, 'errors': form.errors.get_json_data()}, status=400)
+        messages.error(request, "Invalid bulk action.")
+        return redirect('task_list')
+
+    # Scope by the same visibility rule as task_update / task_delete
+    tasks = manageable_tasks(request.user)
+    if form.cleaned_data['apply_to_filter']:
+        # An invalid filter would otherwise match every manageable task, so refuse to act
+        search_form = SearchForm(request.GET)
+        if not search_form.is_valid():
+            if is_ajax:
+                return JsonResponse({'success': False, 'errors': search_form.errors.get_json_data()}, status=400)
+            messages.error(request, "Invalid search filter.")
+            return redirect('task_list')
+        tasks = apply_search_filters(tasks, search_form, timezone.localdate())
+    else:
+        tasks = tasks.filter(pk__in=form.cleaned_data['task_ids'])
+
+    count = bulk_task_action(tasks, form.cleaned_data['action'], form.action_value(), request.user)
+
+    if is_ajax:
+        return JsonResponse({'success': True, 'count': count})
+    messages.success(request, f"{count} tasks updated.")
+    return redirect('task_list')
+
+class Echo:
+    """Pseudo-buffer for csv.writer: write() just hands the line back."""
+    def write(self, value):
+        return value
+
+@login_required
+@rate_limit(cost=10, burst=2, per=60)
+def archive_export(request):
+    profile = request.user_context.profile
+    if profile.role != 'Manager':
+        return HttpResponseForbidden("Only managers can export archived tasks.")
+
+    archived = manageable_tasks(request.user, Task.all_objects.archived())
+    archived = apply_search_filters(archived, SearchForm(request.GET), timezone.localdate())
+    rows = archived.select_related('assigned_to').order_by('-archived_at').values_list(
+        'id', 'title', 'priority', 'status', 'assigned_to__username', 'due_date',
+        'created_at', 'completed_at', 'archived_at', 'comment_count',
+    )
+
+    writer = csv.writer(Echo())
+    header = ['id', 'title', 'priority', 'status', 'assigned_to', 'due_date',
+              'created_at', 'completed_at', 'archived_at', 'comment_count']
+
+    def stream():
+        yield writer.writerow(header)
+        # iterator() keeps memory flat however large the archive is
+        for row in rows.iterator(chunk_size=2000):
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename=archived_tasks.csv'
+    return response
+
+@login_required
+@rate_limit(cost=1, burst=10, per=10)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=notifications_etag, last_modified_func=notifications_last_modified)
 def notifications_api(request):
     notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:20]
     data = {
@@ -513,10 +679,7 @@ def add_comment(request, task_id):
     # Permission check skipped, assuming visibility is already enforced
     form = CommentForm(request.POST)
     if form.is_valid():
-        comment = form.save(commit=False)
-        comment.author = request.user
-        comment.task = task
-        comment.save()
+        add_comment_to_task(task, request.user, form)
     return redirect('task_list')  # or redirect to task detail if needed
 
 @login_required
@@ -536,8 +699,39 @@ def update_task_order(request):
                 task_order.position = pos
                 task_order.save()
 
+            bump_data_version([user.id])
             return JsonResponse({'success': True})
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)})
 
     return JsonResponse({'success': False, 'error': 'Invalid request'})
+
+
+@login_required
+@require_POST
+@rate_limit(cost=2)
+def batch_api(request):
+    try:
+        operations = json.loads(request.body)['operations']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'success': False, 'error': 'Invalid request'}, status=400)
+
+    if not isinstance(operations, list) or len(operations) > MAX_BATCH_OPERATIONS:
+        return JsonResponse(
+            {'success': False, 'error': f'operations must be a list of at most {MAX_BATCH_OPERATIONS} items'},
+            status=400,
+        )
+
+    return JsonResponse({'success': True, 'results': run_batch(request.user, operations)})
+
+
+def metrics_view(request):
+    # Scraped by Prometheus: bearer token if METRICS_TOKEN is set, otherwise an IP allow-list
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        allowed = request.headers.get('Authorization') == f'Bearer {token}'
+    else:
+        allowed = request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1'])
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')